@@ -0,0 +1,1258 @@
+import sys
+import os
+import re
+import argparse
+import platform
+import statistics
+import io
+import json
+import time
+import random
+import datetime
+import base64
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import requests
+import virtualreminder as vr
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+QT_APP = []
+
+def qt_app():
+    from PyQt5.QtWidgets import QApplication
+    if not QT_APP:
+        QT_APP.append(QApplication.instance() or QApplication(sys.argv[:1]))
+    return QT_APP[0]
+
+def pump_events(seconds):
+    app = qt_app()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+def make_reminders(count, seed=0):
+    rng = random.Random(seed)
+    return [{
+        "text": f"Reminder {i}",
+        "time": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+        "active": True
+    } for i in range(count)]
+
+def midnight():
+    today = datetime.date.today()
+    return datetime.datetime.combine(today, datetime.time(0, 0)).timestamp()
+
+@benchmark("scheduler")
+def bench_scheduler():
+    results = {}
+    for count in (100, 1000, 10000, 100000):
+        clock = vr.SimulatedClock(midnight() + 30)
+        scheduler = vr.ReminderScheduler(clock)
+        reminders = make_reminders(count)
+        
+        start = time.perf_counter()
+        scheduler.add_many(reminders)
+        add_many_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        for reminder in reminders[:1000]:
+            scheduler.update(reminder)
+        update_us = (time.perf_counter() - start) * 1e6 / min(count, 1000)
+        
+        fired = {}
+        fire_batches = 0
+        start = time.perf_counter()
+        while len(scheduler):
+            for reminder in scheduler.wait_due():
+                fired[id(reminder)] = fired.get(id(reminder), 0) + 1
+                assert clock.now() < vr.next_fire_time(reminder, clock.now()) + 60
+            fire_batches += 1
+        drain_ms = (time.perf_counter() - start) * 1000
+        
+        assert len(fired) == count and set(fired.values()) == {1}
+        results[count] = {
+            "add_many_ms": round(add_many_ms, 3),
+            "update_us": round(update_us, 3),
+            "drain_ms": round(drain_ms, 3),
+            "fire_batches": fire_batches,
+            "simulated_hours": round((clock.now() - midnight()) / 3600, 2)
+        }
+    return results
+
+@benchmark("scheduler-clock-jump")
+def bench_scheduler_clock_jump():
+    clock = vr.SimulatedClock(midnight() + 12 * 3600)
+    scheduler = vr.ReminderScheduler(clock)
+    morning = {"text": "morning", "time": "09:00", "active": True}
+    evening = {"text": "evening", "time": "18:00", "active": True}
+    scheduler.add_many([morning, evening])
+    
+    clock.jump(-4 * 3600)
+    first = scheduler.wait_due()
+    assert first == [morning], first
+    assert abs(clock.now() - (midnight() + 9 * 3600)) < 1
+    
+    clock.jump(10 * 3600)
+    second = scheduler.wait_due()
+    assert second == [evening], second
+    
+    return {"clock_jumps": scheduler.clock_jumps, "pending": len(scheduler)}
+
+def make_speech_mp3(seconds=3.0):
+    from pydub.generators import Sine
+    audio = Sine(440).to_audio_segment(duration=seconds * 1000).set_frame_rate(24000)
+    buffer = io.BytesIO()
+    audio.export(buffer, format="mp3")
+    return buffer.getvalue()
+
+class StubVoicePlayer(vr.AnimeVoicePlayer):
+    def __init__(self, text, voice_settings, speech_mp3, cache=None, play=False):
+        super().__init__(text, voice_settings, cache, playback=vr.PlaybackEngine())
+        self.speech_mp3 = speech_mp3
+        self.play = play
+        self.sound = None
+    
+    def _generate_speech_file(self, text, filename):
+        with open(filename, "wb") as f:
+            f.write(self.speech_mp3)
+        return "mp3"
+    
+    def _synthesize(self, text):
+        return self.speech_mp3, "mp3"
+    
+    def _play_sound(self, sound):
+        self.sound = sound
+        if self.play:
+            super()._play_sound(sound)
+        else:
+            self._mark_first_audio()
+
+@benchmark("pipeline")
+def bench_pipeline(rounds=10):
+    speech_mp3 = make_speech_mp3()
+    temp_dir = tempfile.gettempdir()
+    results = {}
+    for pipeline in ("file", "memory"):
+        settings = {"pipeline": pipeline, "speed": 1.2, "pitch": 1.0}
+        before = set(os.listdir(temp_dir))
+        timings = []
+        for i in range(rounds):
+            player = StubVoicePlayer(f"utterance {i}", settings, speech_mp3)
+            start = time.perf_counter()
+            player.speak()
+            timings.append((time.perf_counter() - start) * 1000)
+            assert player.sound is not None
+        leftover = set(os.listdir(temp_dir)) - before
+        timings.sort()
+        results[pipeline] = {
+            "median_ms": round(timings[len(timings) // 2], 3),
+            "min_ms": round(timings[0], 3),
+            "leftover_files": len(leftover)
+        }
+    return results
+
+def make_speech_segment(seconds=10.0, frame_rate=24000):
+    from pydub.generators import Sine, WhiteNoise
+    tone = Sine(220).to_audio_segment(duration=seconds * 1000, volume=-12)
+    noise = WhiteNoise().to_audio_segment(duration=seconds * 1000, volume=-30)
+    return tone.overlay(noise).set_frame_rate(frame_rate).set_channels(1).set_sample_width(2)
+
+class LatencyTTS(vr.TTSBackend):
+    name = "latency-stub"
+    
+    def __init__(self, base_latency=0.15, per_char=0.004):
+        self.base_latency = base_latency
+        self.per_char = per_char
+        self.sine = vr.SineBackend()
+    
+    def synthesize(self, text, language):
+        time.sleep(self.base_latency + self.per_char * len(text))
+        return self.sine.synthesize(text, language)
+
+@benchmark("streaming")
+def bench_streaming():
+    tts = vr.TTSManager([LatencyTTS()])
+    results = {}
+    for sentences in (1, 3, 6):
+        text = " ".join(f"Sentence {i} of the reminder is here." for i in range(sentences))
+        for streaming in (False, True):
+            settings = {"tts_backend": "latency-stub", "streaming": streaming,
+                        "speed": 1.0, "pitch": 1.0, "add_words": False}
+            player = vr.AnimeVoicePlayer(text, settings, tts=tts, playback=vr.PlaybackEngine())
+            player.speak()
+            label = f"{sentences} sentences {'streaming' if streaming else 'sequential'}"
+            results[label] = {"time_to_first_audio_ms": round(player.time_to_first_audio * 1000, 1)}
+    return results
+
+@benchmark("playback")
+def bench_playback(rounds=20):
+    engine = vr.PlaybackEngine()
+    speech = engine.to_output_format(make_speech_segment(seconds=5.0))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "speech.wav")
+        speech.export(path, format="wav").close()
+    
+        cold = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            engine.load_file(path)
+            cold.append((time.perf_counter() - start) * 1000)
+    
+        engine.load_file(path, "speech")
+        warm = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            assert engine.get("speech") is not None
+            warm.append((time.perf_counter() - start) * 1000)
+    
+        short = engine.load_segment(engine.to_output_format(make_speech_segment(seconds=0.25)))
+        lags = []
+        for _ in range(5):
+            start = time.monotonic()
+            engine.play(short).wait()
+            lags.append((time.monotonic() - start - short.get_length()) * 1000)
+    
+        return {
+            "decode_cold_ms": round(min(cold), 3),
+            "lru_hit_ms": round(min(warm), 4),
+            "completion_lag_ms": round(max(lags), 2),
+            "engine": engine.stats()
+        }
+
+@benchmark("voice-stages")
+def bench_voice_stages(rounds=5):
+    tts = vr.TTSManager([vr.SineBackend()])
+    directory = tempfile.mkdtemp()
+    speech_path = os.path.join(directory, "speech.wav")
+    processed_path = os.path.join(directory, "processed.wav")
+    previous = vr.default_tracer.enabled
+    results = {}
+    try:
+        for speed, pitch in ((1.0, 1.0), (1.2, 1.0), (1.0, 1.3), (1.2, 1.3)):
+            vr.default_tracer.enabled = True
+            vr.default_tracer.reset()
+            settings = {"tts_backend": "sine", "speed": speed, "pitch": pitch, "add_words": False}
+            player = vr.AnimeVoicePlayer("Time to drink some water and stretch a little.", settings,
+                                         tts=tts, playback=vr.PlaybackEngine())
+            for _ in range(rounds):
+                audio_format = player._generate_speech_file(player.text, speech_path)
+                player._process_audio(speech_path, processed_path, audio_format)
+                player.playback.load_file(processed_path)
+            results[f"speed={speed} pitch={pitch}"] = {
+                f"{stage}_ms": round(stats["p50"] * 1000, 3)
+                for stage, stats in vr.default_tracer.snapshot().items()}
+    finally:
+        vr.default_tracer.enabled = previous
+        vr.default_tracer.reset()
+        vr.shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+@benchmark("dsp")
+def bench_dsp(rounds=3):
+    audio = make_speech_segment()
+    seconds = len(audio) / 1000.0
+    results = {}
+    for backend in ("pydub", "numpy"):
+        for speed, pitch in ((1.2, 1.0), (1.0, 1.3), (1.2, 1.3)):
+            player = vr.AnimeVoicePlayer("", {"dsp": backend, "speed": speed, "pitch": pitch})
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                processed = player._apply_effects(audio)
+                timings.append(time.perf_counter() - start)
+            results[f"{backend} speed={speed} pitch={pitch}"] = {
+                "ms_per_audio_second": round(min(timings) * 1000 / seconds, 3),
+                "duration_ratio": round(len(processed) / len(audio), 3)
+            }
+    return results
+
+class StubTTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+        payload = base64.b64encode(self.server.audio).decode("ascii")
+        body = (")]}'\n\n" + '[["wrb.fr","jQ1olc","[\\"' + payload +
+                '\\"]",null,null,null,"generic"]]\n').encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.requests += 1
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_tts_server(latency=0.05, audio=b"ID3stub"):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTTSHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.audio = audio
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def synthesize_sequentially(service, text, language):
+    audio = []
+    for prepared in service._prepare(text, language):
+        with requests.Session() as session:
+            response = session.send(prepared, timeout=service.timeout)
+        response.raise_for_status()
+        audio.append(response.content)
+    return b"".join(audio)
+
+@benchmark("gtts-service")
+def bench_gtts_service(latency=0.05):
+    server, base_url = start_stub_tts_server(latency)
+    long_text = " ".join(f"This is sentence number {i} of a long reminder." for i in range(12))
+    batch = [f"Reminder {i}: stretch and drink some water." for i in range(20)]
+    results = {"latency_ms": latency * 1000}
+    try:
+        service = vr.GTTSSynthesisService(max_workers=8, base_url=base_url)
+        chunks = len(service._prepare(long_text, "en"))
+        
+        start = time.perf_counter()
+        synthesize_sequentially(service, long_text, "en")
+        results["long_sequential_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        start = time.perf_counter()
+        audio = service.synthesize(long_text, "en")
+        results["long_pooled_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        assert audio == server.audio * chunks
+        results["long_chunks"] = chunks
+        
+        start = time.perf_counter()
+        for text in batch:
+            synthesize_sequentially(service, text, "en")
+        results["batch_sequential_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        start = time.perf_counter()
+        audios = service.synthesize_batch(batch, "en")
+        results["batch_pooled_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        assert len(audios) == len(batch) and all(audio == server.audio for audio in audios)
+        service.close()
+    finally:
+        server.shutdown()
+    return results
+
+def settings_with(reminders):
+    return {
+        "image_path": "",
+        "reminders": reminders,
+        "voice_settings": {"language": "ja", "speed": 1.2, "pitch": 1.3, "add_words": True},
+        "prerender_minutes": 10
+    }
+
+@benchmark("storage")
+def bench_storage():
+    results = {}
+    for count in (1000, 10000, 100000):
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "settings.json")
+            sqlite_path = os.path.join(directory, "settings.db")
+            reminders = make_reminders(count)
+            row = {}
+        
+            store = vr.JsonSettingsStore(json_path)
+            start = time.perf_counter()
+            store.save(settings_with(reminders))
+            row["json_save_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            start = time.perf_counter()
+            assert len(store.load()["reminders"]) == count
+            row["json_load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            row["json_bytes"] = os.path.getsize(json_path)
+        
+            start = time.perf_counter()
+            store = vr.SqliteSettingsStore(sqlite_path, legacy_json=json_path)
+            row["sqlite_migrate_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            start = time.perf_counter()
+            loaded = store.load()
+            row["sqlite_load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            assert len(loaded["reminders"]) == count
+        
+            settings = settings_with(loaded["reminders"])
+            start = time.perf_counter()
+            store.save(settings)
+            row["sqlite_full_save_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        
+            changed = loaded["reminders"][count // 2]
+            changed["active"] = False
+            start = time.perf_counter()
+            for _ in range(100):
+                store.save(settings, [changed])
+            row["sqlite_incremental_save_ms"] = round((time.perf_counter() - start) * 10, 3)
+        
+            added = {"text": "new", "time": "12:00", "active": True}
+            settings["reminders"].append(added)
+            store.save(settings, [added])
+            assert added["id"] and len(store.load()["reminders"]) == count + 1
+            store.close()
+            results[count] = row
+        return results
+
+@benchmark("write-behind")
+def bench_write_behind(changes=120, interval=0.016):
+    qt_app()
+    results = {}
+    for storage in ("json", "sqlite"):
+        with tempfile.TemporaryDirectory() as directory:
+            store = vr.WriteBehindStore(vr.open_settings_store(
+                storage, os.path.join(directory, "settings.json"), os.path.join(directory, "settings.db")),
+                delay_ms=300)
+            settings = settings_with(make_reminders(10000))
+            store.save(settings)
+            store.flush()
+        
+            start = time.perf_counter()
+            for i in range(changes):
+                settings["voice_settings"]["speed"] = 0.8 + (i % 70) / 100.0
+                store.save(settings, [])
+                pump_events(interval)
+            drag_ms = (time.perf_counter() - start) * 1000
+            pump_events(0.5)
+            store.close()
+        
+            reloaded = vr.open_settings_store(
+                storage, os.path.join(directory, "settings.json"), os.path.join(directory, "settings.db"))
+            assert reloaded.load()["voice_settings"]["speed"] == settings["voice_settings"]["speed"]
+            reloaded.close()
+            results[storage] = dict(store.stats(), drag_ms=round(drag_ms, 1))
+        return results
+
+def legacy_text_display(reminders):
+    from PyQt5.QtWidgets import QTextEdit
+    display = QTextEdit()
+    display.setReadOnly(True)
+    start = time.perf_counter()
+    display.clear()
+    for i, reminder in enumerate(reminders):
+        status = "Active" if reminder["active"] else "Done"
+        display.append(f"{i+1}. {reminder['time']} - {reminder['text']} ({status})")
+    return (time.perf_counter() - start) * 1000
+
+def timed_ms(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return round((time.perf_counter() - start) * 1000, 2)
+
+@benchmark("reminder-view")
+def bench_reminder_view(count=100000, legacy_counts=(1000, 10000)):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QTableView, QHeaderView
+    qt_app()
+    results = {"legacy_rebuild_ms": {n: round(legacy_text_display(make_reminders(n)), 1)
+                                     for n in legacy_counts}}
+    
+    reminders = make_reminders(count)
+    start = time.perf_counter()
+    model = vr.ReminderTableModel(reminders)
+    proxy = vr.ReminderFilterProxy()
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(22)
+    view.setModel(proxy)
+    view.setSortingEnabled(True)
+    view.sortByColumn(vr.ReminderTableModel.TIME, Qt.AscendingOrder)
+    view.resize(330, 300)
+    view.show()
+    pump_events(0.05)
+    results["build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    
+    results["paint_ms"] = timed_ms(view.viewport().grab)
+    added = {"text": "New reminder", "time": "12:00", "active": True}
+    results["append_one_ms"] = timed_ms(model.append_reminders, [added])
+    reminders[count // 2]["active"] = False
+    results["update_one_ms"] = timed_ms(model.reminder_changed, reminders[count // 2])
+    results["filter_text_ms"] = timed_ms(proxy.set_text_filter, "12:0")
+    results["filtered_rows"] = proxy.rowCount()
+    results["filter_clear_ms"] = timed_ms(proxy.set_text_filter, "")
+    results["remove_one_ms"] = timed_ms(model.remove_reminders, [added])
+    results["rows"] = proxy.rowCount()
+    view.close()
+    return results
+
+def make_character_image(directory, size=1024):
+    from PyQt5.QtGui import QImage, QColor
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(QColor(200, 150, 255))
+    path = os.path.join(directory, "character.png")
+    image.save(path)
+    return path
+
+def legacy_character_paint(widget, source, painter):
+    from PyQt5.QtCore import Qt, QPoint
+    from PyQt5.QtGui import QFont, QPainter
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+    painter.drawPixmap(0, 0, source.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+    if widget.show_speech and widget.speech_text:
+        bubble_width = max(200, len(widget.speech_text) * 8)
+        bubble_x = (widget.width() - bubble_width) // 2
+        painter.setPen(Qt.black)
+        painter.setBrush(Qt.white)
+        painter.drawRoundedRect(bubble_x, -60, bubble_width, 60, 10, 10)
+        painter.drawPolygon([QPoint(100, 0), QPoint(90, -10), QPoint(110, -10)])
+        painter.setFont(QFont('Arial', 10))
+        painter.drawText(bubble_x + 10, -50, bubble_width - 20, 40,
+                         Qt.AlignCenter | Qt.TextWordWrap, widget.speech_text)
+
+def average_ms(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return round((time.perf_counter() - start) * 1000 / rounds, 3)
+
+@benchmark("character-paint")
+def bench_character_paint(rounds=200):
+    from PyQt5.QtCore import QPoint
+    from PyQt5.QtGui import QImage, QPainter, QPixmap, QRegion
+    qt_app()
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_character_image(directory)
+        source = QPixmap(path)
+        widget = vr.CharacterWidget(path, vr.ImageCache())
+        widget.show()
+        pump_events(0.05)
+        message = "Time to drink some water and stretch a little, desu! " * 3
+        canvas = QImage(widget.size(), QImage.Format_ARGB32_Premultiplied)
+    
+        def legacy():
+            painter = QPainter(canvas)
+            legacy_character_paint(widget, source, painter)
+            painter.end()
+    
+        def full():
+            widget.render(canvas)
+    
+        def bubble_only():
+            widget.render(canvas, QPoint(), QRegion(widget.bubble_rect))
+    
+        results = {"legacy_sprite_ms": average_ms(legacy, rounds), "sprite_ms": average_ms(full, rounds)}
+        widget.show_message(message)
+        results["legacy_with_bubble_ms"] = average_ms(legacy, rounds)
+        results["with_bubble_ms"] = average_ms(full, rounds)
+        results["bubble_region_ms"] = average_ms(bubble_only, rounds)
+        results["show_message_ms"] = average_ms(lambda: widget.show_message(message), rounds)
+        results["bubble_inside_widget"] = widget.rect().contains(widget.bubble_rect)
+        widget.close()
+    
+        gif = vr.CharacterWidget(make_gif(directory), vr.ImageCache())
+        gif.show()
+        pump_events(0.1)
+        results["gif_sprite_ms"] = average_ms(lambda: gif.render(canvas), rounds)
+        gif.close()
+        return results
+
+def gif_frame_data(width, height, color):
+    codes = []
+    for offset in range(0, width * height, 254):
+        codes.append(256)
+        codes.extend([color] * min(254, width * height - offset))
+    codes.append(257)
+    data = bytearray()
+    accumulator = bits = 0
+    for code in codes:
+        accumulator |= code << bits
+        bits += 9
+        while bits >= 8:
+            data.append(accumulator & 0xFF)
+            accumulator >>= 8
+            bits -= 8
+    if bits:
+        data.append(accumulator)
+    blocks = bytearray([8])
+    for offset in range(0, len(data), 255):
+        chunk = data[offset:offset + 255]
+        blocks.append(len(chunk))
+        blocks.extend(chunk)
+    blocks.append(0)
+    return bytes(blocks)
+
+def make_gif(directory, frames=20, size=256, delay_ms=50, loops=0):
+    palette = bytearray()
+    for i in range(256):
+        palette.extend(((i * 37) % 256, (i * 91) % 256, (i * 53) % 256))
+    out = bytearray(b"GIF89a")
+    out += size.to_bytes(2, "little") * 2 + bytes([0xF7, 0, 0]) + palette
+    if loops is not None:
+        out += b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + loops.to_bytes(2, "little") + b"\x00"
+    for frame in range(frames):
+        out += b"\x21\xf9\x04\x00" + (delay_ms // 10).to_bytes(2, "little") + b"\x00\x00"
+        out += b"\x2c\x00\x00\x00\x00" + size.to_bytes(2, "little") * 2 + b"\x00"
+        out += gif_frame_data(size, size, frame % 256)
+    out += b"\x3b"
+    path = os.path.join(directory, "character.gif")
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+def process_cpu_during(seconds):
+    start = time.process_time()
+    pump_events(seconds)
+    return round((time.process_time() - start) * 1000, 1)
+
+@benchmark("gif-animation")
+def bench_gif_animation(seconds=1.0):
+    from PyQt5.QtCore import QSize
+    from PyQt5.QtGui import QMovie
+    qt_app()
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_gif(directory)
+        results = {"event_loop_baseline_cpu_ms": process_cpu_during(seconds)}
+    
+        movie = QMovie(path)
+        movie.setScaledSize(QSize(200, 200))
+        movie.start()
+        results["legacy_qmovie_hidden_cpu_ms"] = process_cpu_during(seconds)
+        movie.stop()
+    
+        widget = vr.CharacterWidget(path)
+        widget.show()
+        visible_cpu = process_cpu_during(seconds)
+        visible = widget.stats()["animation"]
+        widget.hide()
+        hidden_cpu = process_cpu_during(seconds)
+        hidden = widget.stats()["animation"]
+        results["cached"] = dict(visible, visible_cpu_ms=visible_cpu, hidden_cpu_ms=hidden_cpu,
+                                 ticks_while_hidden=hidden["ticks"] - visible["ticks"])
+        widget.close()
+    
+        streaming = vr.FrameAnimation(path, QSize(200, 200), memory_budget=1024 * 1024)
+        streaming.start()
+        results["streaming_cpu_ms"] = process_cpu_during(seconds)
+        streaming.stop()
+        results["streaming"] = streaming.stats()
+    
+        for loops, plays in ((None, 1), (1, 2)):
+            once = vr.FrameAnimation(make_gif(directory, frames=5, delay_ms=20, loops=loops), QSize(200, 200))
+            once.start()
+            pump_events(seconds)
+            assert once.finished and not once.is_running() and once.ticks == 5 * plays - 1, once.stats()
+        results["finite_loops_honored"] = True
+        return results
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def pixmap_bytes(pixmaps):
+    return sum(p.width() * p.height() * p.depth() // 8 for p in pixmaps)
+
+@benchmark("image-cache")
+def bench_image_cache(size=(3840, 2160)):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage, QColor, QPixmap, QIcon
+    qt_app()
+    image = QImage(size[0], size[1], QImage.Format_ARGB32)
+    image.fill(QColor(120, 80, 200))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "character-4k.png")
+        image.save(path)
+        del image
+        results = {}
+    
+        cache = vr.ImageCache()
+        rss = rss_bytes()
+        start = time.perf_counter()
+        label = cache.pixmap(path, 200, 200)
+        sprite = cache.pixmap(path, 200, 200)
+        icon = cache.icon(path)
+        icon.pixmap(32)
+        results["cached"] = dict(cache.stats(), ms=round((time.perf_counter() - start) * 1000, 1),
+                                 rss_delta_bytes=rss_bytes() - rss)
+    
+        rss = rss_bytes()
+        start = time.perf_counter()
+        label_source = QPixmap(path)
+        legacy_label = label_source.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        legacy_sprite = QPixmap(path)
+        legacy_icon = QIcon(path)
+        legacy_icon.pixmap(32)
+        results["legacy"] = {
+            "bytes": pixmap_bytes([legacy_label, legacy_sprite]),
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+            "rss_delta_bytes": rss_bytes() - rss
+        }
+        assert label is sprite
+        return results
+
+STARTUP_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import virtualreminder as vr
+imported = time.perf_counter()
+from PyQt5.QtCore import QObject, QEvent, QTimer
+from PyQt5.QtWidgets import QApplication
+
+class FirstPaint(QObject):
+    painted = None
+    
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.painted is None:
+            self.painted = time.perf_counter()
+            self.audio_loaded = "pygame" in sys.modules
+            QTimer.singleShot(0, app.quit)
+        return False
+
+app = QApplication(sys.argv[:1])
+widget = vr.AnimeReminderWidget()
+probe = FirstPaint()
+widget.character_widget.installEventFilter(probe)
+app.exec_()
+widget.core.audio_thread.join()
+audio_ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_paint_ms": (probe.painted - start) * 1000,
+    "audio_ready_ms": (audio_ready - start) * 1000,
+    "audio_loaded_at_first_paint": probe.audio_loaded
+}))
+widget.quit_app()
+"""
+
+EAGER_IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import pygame, requests, numpy, gtts, pydub, pydub.effects
+pygame.init()
+print((time.perf_counter() - start) * 1000)
+"""
+
+def run_probe(source, *args):
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run([sys.executable, "-c", source] + list(args), cwd=directory,
+                                capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+@benchmark("startup")
+def bench_startup(rounds=3):
+    repo = os.path.dirname(os.path.abspath(__file__))
+    runs = [run_probe(STARTUP_PROBE, repo) for _ in range(rounds)]
+    results = {key: round(min(run[key] for run in runs), 1)
+               for key in ("import_ms", "first_paint_ms", "audio_ready_ms")}
+    results["audio_loaded_at_first_paint"] = any(run["audio_loaded_at_first_paint"] for run in runs)
+    assert not results["audio_loaded_at_first_paint"], runs
+    results["eager_audio_stack_ms"] = round(min(run_probe(EAGER_IMPORT_PROBE) for _ in range(rounds)), 1)
+    return results
+
+def process_rss_bytes(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+def process_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def measure_idle(args, settle=5.0, window=20.0):
+    with tempfile.TemporaryDirectory() as directory:
+        process = subprocess.Popen([sys.executable, vr.__file__] + args, cwd=directory,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            time.sleep(settle)
+            cpu = process_cpu_seconds(process.pid)
+            time.sleep(window)
+            return {
+                "rss_mb": round(process_rss_bytes(process.pid) / 1024 / 1024, 1),
+                "idle_cpu_percent": round((process_cpu_seconds(process.pid) - cpu) / window * 100, 2)
+            }
+        finally:
+            process.kill()
+            process.wait()
+
+@benchmark("headless")
+def bench_headless():
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "control.sock")
+        return {
+            "gui": measure_idle([]),
+            "headless": measure_idle(["--headless", "--socket", socket_path])
+        }
+
+@benchmark("recurrence")
+def bench_recurrence(reminders=1000):
+    start = datetime.datetime.fromtimestamp(midnight())
+    year_end = (start + datetime.timedelta(days=365)).timestamp()
+    rule = vr.RecurrenceRule.parse("FREQ=MINUTELY;INTERVAL=5;UNTIL=" +
+                                   (start + datetime.timedelta(days=365)).strftime("%Y%m%dT%H%M"))
+    results = {}
+    
+    tracemalloc.start()
+    occurrences = 0
+    for fire_time in rule.occurrences(start, start.timestamp() - 1):
+        occurrences += 1
+    lazy_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    tracemalloc.start()
+    materialized = list(rule.occurrences(start, start.timestamp() - 1))
+    list_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert len(materialized) == occurrences and materialized[-1] <= year_end
+    results["year_of_5_minutes"] = {
+        "occurrences": occurrences,
+        "lazy_peak_bytes": lazy_peak,
+        "materialized_peak_bytes": list_peak
+    }
+    
+    now = midnight() + 180 * 86400 + 3600
+    next_fire = {}
+    for text in ("daily", "weekdays", "every 5 minutes", "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE,FR;COUNT=500"):
+        reminder = vr.make_reminder("bench", "08:30", text)
+        reminder["start"] = start.date().isoformat()
+        began = time.perf_counter()
+        for _ in range(1000):
+            vr.next_fire_time(reminder, now)
+        next_fire[text] = round((time.perf_counter() - began) * 1000, 3)
+    results["next_fire_us"] = next_fire
+    
+    clock = vr.SimulatedClock(midnight() + 30)
+    scheduler = vr.ReminderScheduler(clock)
+    recurring = [vr.make_reminder(f"Reminder {i}", f"00:{i % 60:02d}", "every 5 minutes")
+                 for i in range(reminders)]
+    scheduler.add_many(recurring)
+    fired = 0
+    began = time.perf_counter()
+    while clock.now() < midnight() + 86400:
+        fired += len(scheduler.wait_due())
+    results["scheduler_day"] = {
+        "reminders": reminders,
+        "fired": fired,
+        "ms": round((time.perf_counter() - began) * 1000, 1),
+        "heap_entries": len(scheduler.heap)
+    }
+    return results
+
+def event_loop_latency(work, interval_ms=5):
+    from PyQt5.QtCore import QTimer, Qt
+    app = qt_app()
+    lateness = []
+    expected = [time.perf_counter() + interval_ms / 1000]
+    
+    def tick():
+        now = time.perf_counter()
+        lateness.append(max(0.0, now - expected[0]) * 1000)
+        expected[0] = now + interval_ms / 1000
+    
+    timer = QTimer()
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.timeout.connect(tick)
+    timer.start(interval_ms)
+    worker = threading.Thread(target=work)
+    started = time.perf_counter()
+    worker.start()
+    while worker.is_alive():
+        app.processEvents()
+        time.sleep(0.0005)
+    elapsed = time.perf_counter() - started
+    timer.stop()
+    lateness.sort()
+    return {
+        "work_ms": round(elapsed * 1000, 1),
+        "ticks": len(lateness),
+        "p50_late_ms": round(lateness[len(lateness) // 2], 2),
+        "p95_late_ms": round(lateness[int(len(lateness) * 0.95)], 2),
+        "max_late_ms": round(lateness[-1], 2)
+    }
+
+@benchmark("offload")
+def bench_offload(seconds=30.0):
+    qt_app()
+    speech_mp3 = make_speech_mp3(seconds)
+    offload = vr.AudioOffload()
+    offload.start().submit(vr._offload_warm_up).result()
+    results = {}
+    for enabled in (False, True):
+        settings = {"speed": 1.2, "pitch": 1.3, "offload": enabled}
+        player = StubVoicePlayer("offload", settings, speech_mp3)
+        player.offload = offload
+        segments = []
+        results["offload" if enabled else "in-process"] = event_loop_latency(
+            lambda: segments.append(player.render_segment()))
+        assert len(segments[0]) > 0
+    offload.shutdown()
+    results["offload_jobs"] = offload.jobs
+    return results
+
+@benchmark("tracing")
+def bench_tracing(spans=200000, utterances=5):
+    tracer = vr.LatencyTracer()
+    results = {}
+    for enabled in (False, True):
+        tracer.enabled = enabled
+        start = time.perf_counter()
+        for _ in range(spans):
+            with tracer.span("bench"):
+                pass
+        results["span_ns_enabled" if enabled else "span_ns_disabled"] = round(
+            (time.perf_counter() - start) * 1e9 / spans, 1)
+    
+    start = time.perf_counter()
+    for _ in range(spans):
+        pass
+    results["empty_loop_ns"] = round((time.perf_counter() - start) * 1e9 / spans, 1)
+    
+    previous = vr.default_tracer.enabled
+    vr.default_tracer.enabled = True
+    vr.default_tracer.reset()
+    try:
+        tts = vr.TTSManager([vr.SineBackend()])
+        for i in range(utterances):
+            player = vr.AnimeVoicePlayer(f"Trace utterance {i}.", {"tts_backend": "sine"},
+                                         tts=tts, playback=vr.PlaybackEngine())
+            player.render_segment()
+        results["stages_p50_ms"] = {stage: round(stats["p50"] * 1000, 3)
+                                    for stage, stats in vr.default_tracer.snapshot().items()}
+        results["prometheus_lines"] = len(vr.default_tracer.to_prometheus().splitlines())
+    finally:
+        vr.default_tracer.enabled = previous
+        vr.default_tracer.reset()
+    return results
+
+class BlipTTS(vr.TTSBackend):
+    name = "blip"
+    frame_rate = 24000
+    
+    def __init__(self, seconds=0.5, fail_every=0):
+        self.samples = [int(4000 * vr.math.sin(2 * vr.math.pi * 440 * n / self.frame_rate))
+                        for n in range(int(self.frame_rate * seconds))]
+        self.fail_every = fail_every
+        self.calls = 0
+    
+    def synthesize(self, text, language):
+        self.calls += 1
+        if self.fail_every and self.calls % self.fail_every == 0:
+            raise RuntimeError("simulated TTS failure")
+        buffer = io.BytesIO()
+        with vr.wave.open(buffer, "wb") as output:
+            output.setnchannels(1)
+            output.setsampwidth(2)
+            output.setframerate(self.frame_rate)
+            output.writeframes(vr.array.array("h", self.samples).tobytes())
+        return buffer.getvalue()
+
+class MutedPlayback(vr.PlaybackEngine):
+    def play(self, sound, on_finished=None):
+        self.ensure_init()
+        playback = vr.Playback(sound, None, time.monotonic(), on_finished)
+        playback.finish()
+        return playback
+
+def wait_for_voice(service, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while service.depth() or service.current is not None:
+        if time.perf_counter() > deadline:
+            raise TimeoutError("voice service did not drain")
+        pump_events(0.002)
+
+def resource_sample(monitor):
+    import gc
+    gc.collect()
+    report = monitor.snapshot(top=0)
+    return {
+        "rss_bytes": report["memory"].get("rss_bytes", 0),
+        "python_objects": report["memory"]["python_objects"],
+        "fds": report["files"]["fds"],
+        "temp_files": len(report["files"]["temp_files"]) + len(report["files"]["open_temp_files"]),
+        "threads": len(report["threads"]["python"])
+    }
+
+@benchmark("soak")
+def bench_soak(reminders=3000, warmup=500, batch=10, texts=97):
+    qt_app()
+    previous_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="soak_")
+    os.chdir(work_dir)
+    tts = BlipTTS(fail_every=41)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            widget = vr.AnimeReminderWidget()
+            widget.core.voice_settings.update({"tts_backend": "blip", "add_words": False})
+            widget.core.voice_service.tts = vr.TTSManager([tts])
+            widget.core.voice_service.cache = vr.AudioCache("soak_cache", max_bytes=256 * 1024)
+            widget.core.voice_service.playback = MutedPlayback(memory_budget=256 * 1024)
+            pool = [vr.make_reminder(f"Soak reminder {i}", "08:00") for i in range(texts)]
+            widget.reminders_model.append_reminders(pool)
+            pump_events(0.2)
+            
+            samples = []
+            start = time.perf_counter()
+            for i in range(warmup + reminders):
+                widget.core.voice_settings["pipeline"] = "file" if i % 2 else "memory"
+                widget.core.fire_reminder(pool[i % texts])
+                if i % batch == batch - 1:
+                    wait_for_voice(widget.core.voice_service)
+                if i + 1 >= warmup and (i + 1 - warmup) % (reminders // 10) == 0:
+                    samples.append(resource_sample(vr.default_resources))
+            elapsed = time.perf_counter() - start
+            wait_for_voice(widget.core.voice_service)
+            spoken = widget.core.voice_service.spoken
+            widget.quit_app()
+    finally:
+        os.chdir(previous_dir)
+        vr.shutil.rmtree(work_dir, ignore_errors=True)
+    
+    first, last = samples[0], samples[-1]
+    growth = {key: last[key] - first[key] for key in first}
+    assert growth["fds"] <= 0, growth
+    assert growth["threads"] <= 0, growth
+    assert last["temp_files"] == 0, last
+    assert growth["rss_bytes"] < 8 * 1024 * 1024, growth
+    assert growth["python_objects"] < 2000, growth
+    return {
+        "reminders": warmup + reminders,
+        "spoken": spoken,
+        "tts_failures": tts.calls // tts.fail_every,
+        "seconds": round(elapsed, 1),
+        "after_warmup": first,
+        "growth": growth,
+        "rss_mb_samples": [round(sample["rss_bytes"] / 2 ** 20, 1) for sample in samples]
+    }
+
+def write_import_csv(path, count, duplicate_every=100, invalid_every=1000):
+    rng = random.Random(0)
+    with open(path, "w", newline="") as f:
+        f.write("time,text,repeat,start,active\n")
+        row = ""
+        for i in range(count):
+            if i % duplicate_every == duplicate_every - 1:
+                f.write(row)
+                continue
+            if i % invalid_every == invalid_every // 2:
+                f.write(f"24:{i % 60:02d},Broken reminder {i},,,\n")
+                continue
+            repeat = "daily" if i % 7 == 0 else ""
+            row = f"{rng.randrange(24):02d}:{rng.randrange(60):02d},\"Imported reminder {i}, desu\",{repeat},,\n"
+            f.write(row)
+
+def write_import_ics(path, count):
+    rng = random.Random(1)
+    reminders = (vr.make_reminder(f"Calendar event {i}", f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+                                  "FREQ=WEEKLY;BYDAY=MO" if i % 5 == 0 else None, "2099-01-01")
+                 for i in range(count))
+    with open(path, "w", newline="") as f:
+        vr.write_ics_reminders(reminders, f)
+
+def eager_import_csv(path):
+    import csv
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f.read().splitlines()))
+    return vr.import_reminders(enumerate(rows, 2))
+
+def traced_import(load, path):
+    import gc
+    gc.collect()
+    start = time.perf_counter()
+    result = load(path)
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = load(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        "ms": round(elapsed * 1000, 1),
+        "imported": len(result["imported"]),
+        "duplicates": result["duplicates"],
+        "invalid": result["invalid"],
+        "peak_mb": round(peak / 2 ** 20, 1),
+        "retained_mb": round(retained / 2 ** 20, 1)
+    }
+
+@benchmark("bulk-import")
+def bench_bulk_import(count=100000):
+    qt_app()
+    directory = tempfile.mkdtemp(prefix="import_")
+    csv_path = os.path.join(directory, "reminders.csv")
+    ics_path = os.path.join(directory, "reminders.ics")
+    write_import_csv(csv_path, count)
+    write_import_ics(ics_path, count)
+    results = {"csv_file_mb": round(os.path.getsize(csv_path) / 2 ** 20, 1),
+               "ics_file_mb": round(os.path.getsize(ics_path) / 2 ** 20, 1)}
+    
+    result, results["csv_streaming"] = traced_import(vr.import_reminders_file, csv_path)
+    del result
+    result, results["legacy_csv_eager"] = traced_import(eager_import_csv, csv_path)
+    del result
+    result, results["ics_streaming"] = traced_import(vr.import_reminders_file, ics_path)
+    assert results["ics_streaming"]["imported"] == count, results["ics_streaming"]
+    del result
+    
+    previous_dir = os.getcwd()
+    os.chdir(directory)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            widget = vr.AnimeReminderWidget()
+            writes = widget.core.store.stats()["writes_issued"]
+            start = time.perf_counter()
+            imported = widget.import_reminders_file(csv_path)
+            results["widget_import_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            start = time.perf_counter()
+            widget.core.store.flush()
+            results["persist_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            results["persist_writes"] = widget.core.store.stats()["writes_issued"] - writes
+            results["model_rows"] = widget.reminders_model.rowCount()
+            assert results["model_rows"] == len(imported["imported"])
+            
+            start = time.perf_counter()
+            again = widget.import_reminders_file(csv_path)
+            results["reimport_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            assert not again["imported"], again["imported"][:3]
+            
+            export_path = os.path.join(directory, "export.csv")
+            tracemalloc.start()
+            start = time.perf_counter()
+            vr.export_reminders_file(export_path, widget.core.reminders)
+            results["export_csv_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            results["export_csv_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+            tracemalloc.stop()
+            start = time.perf_counter()
+            vr.export_reminders_file(os.path.join(directory, "export.ics"), widget.core.reminders)
+            results["export_ics_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            widget.quit_app()
+    finally:
+        os.chdir(previous_dir)
+        vr.shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+UNIT_FLOORS = {"ns": 50, "us": 1, "ms": 0.5, "seconds": 0.1, "bytes": 64 * 1024, "mb": 1, "percent": 0.5}
+UNIT_PATTERN = re.compile(r"(?:^|_)(ns|us|ms|seconds|bytes|mb|percent)(?:_|$)")
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+def regression_floor(path):
+    parts = path.split("/")
+    if any(part.startswith("legacy") or "baseline" in part for part in parts):
+        return None
+    for part in reversed(parts):
+        match = UNIT_PATTERN.search(part)
+        if match:
+            return UNIT_FLOORS[match.group(1)]
+    return None
+
+def median_results(runs):
+    first = runs[0]
+    if isinstance(first, dict):
+        return {key: median_results([run[key] for run in runs if key in run]) for key in first}
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        return statistics.median(runs)
+    return runs[-1]
+
+def run_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+def load_results(path):
+    with open(path) as f:
+        data = json.load(f)
+    if "results" not in data:
+        data = {"meta": {}, "results": data}
+    return data
+
+def compare_results(baseline, current, threshold):
+    before = dict(flatten(baseline["results"]))
+    regressions, improvements = [], []
+    for path, value in flatten(current["results"]):
+        floor = regression_floor(path)
+        if floor is None or path not in before:
+            continue
+        old = before[path]
+        if abs(value - old) <= floor:
+            continue
+        change = (value - old) / old if old else float("inf")
+        if change > threshold:
+            regressions.append((path, old, value, change))
+        elif -change > threshold:
+            improvements.append((path, old, value, change))
+    return regressions, improvements
+
+def print_comparison(baseline, current, threshold):
+    if baseline["meta"].get("platform") != current["meta"].get("platform"):
+        print(f"warning: baseline was recorded on {baseline['meta'].get('platform', 'an unknown platform')}")
+    regressions, improvements = compare_results(baseline, current, threshold)
+    for title, rows in (("Regressions", regressions), ("Improvements", improvements)):
+        if rows:
+            print(f"{title} (beyond {threshold:.0%}):")
+        for path, old, value, change in rows:
+            print(f"  {path}: {old:g} -> {value:g} ({change:+.0%})")
+    if not regressions:
+        print("No regressions.")
+    return regressions
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the anime reminder widget.")
+    parser.add_argument("names", nargs="*", metavar="NAME", help="benchmarks to run (default: all)")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    parser.add_argument("--repeat", type=int, default=1, help="run each benchmark N times and keep medians")
+    parser.add_argument("--output", help="write results with run metadata to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved results file")
+    parser.add_argument("--input", metavar="RESULTS", help="compare this saved results file instead of running")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown treated as a regression")
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+    
+    if args.input:
+        current = load_results(args.input)
+    else:
+        results = {}
+        for name in args.names or list(BENCHMARKS):
+            results[name] = median_results([BENCHMARKS[name]() for _ in range(max(1, args.repeat))])
+        current = {"meta": run_metadata(), "results": results}
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+        print(json.dumps(results, indent=2))
+    
+    if args.compare:
+        return 1 if print_comparison(load_results(args.compare), current, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
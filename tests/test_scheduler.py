@@ -0,0 +1,144 @@
+import datetime
+
+import pytest
+
+import virtualreminder as vr
+
+MONDAY = datetime.datetime(2024, 1, 1)
+
+def at(day=0, hour=0, minute=0):
+    return (MONDAY + datetime.timedelta(days=day, hours=hour, minutes=minute)).timestamp()
+
+def make_scheduler(start):
+    clock = vr.SimulatedClock(start)
+    return clock, vr.ReminderScheduler(clock)
+
+def drain(clock, scheduler, until):
+    fired = []
+    while len(scheduler) and clock.now() < until:
+        for reminder in scheduler.wait_due():
+            if clock.now() < until:
+                fired.append((reminder["text"], clock.now()))
+    return fired
+
+def test_fires_in_time_order_once_per_day():
+    clock, scheduler = make_scheduler(at(hour=6))
+    evening = vr.make_reminder("evening", "18:00")
+    morning = vr.make_reminder("morning", "09:00")
+    scheduler.add_many([evening, morning])
+    
+    fired = drain(clock, scheduler, at(hour=23))
+    
+    assert [text for text, _ in fired] == ["morning", "evening"]
+    assert at(hour=9) <= fired[0][1] < at(hour=9, minute=1)
+    assert at(hour=18) <= fired[1][1] < at(hour=18, minute=1)
+    assert len(scheduler) == 0
+
+def test_inactive_reminders_are_not_scheduled():
+    clock, scheduler = make_scheduler(at(hour=6))
+    reminder = vr.make_reminder("off", "09:00")
+    reminder["active"] = False
+    scheduler.add(reminder)
+    
+    assert len(scheduler) == 0
+    assert drain(clock, scheduler, at(hour=10)) == []
+
+def test_update_and_remove():
+    clock, scheduler = make_scheduler(at(hour=6))
+    moved = vr.make_reminder("moved", "07:00")
+    removed = vr.make_reminder("removed", "08:00")
+    scheduler.add_many([moved, removed])
+    
+    moved["time"] = "10:00"
+    scheduler.update(moved)
+    scheduler.remove(removed)
+    
+    fired = drain(clock, scheduler, at(hour=12))
+    assert [text for text, _ in fired] == ["moved"]
+    assert fired[0][1] >= at(hour=10)
+
+def test_backward_clock_jump_reschedules():
+    clock, scheduler = make_scheduler(at(hour=12))
+    morning = vr.make_reminder("morning", "09:00")
+    evening = vr.make_reminder("evening", "18:00")
+    scheduler.add_many([morning, evening])
+    
+    clock.jump(-4 * 3600)
+    assert scheduler.wait_due() == [morning]
+    assert abs(clock.now() - at(hour=9)) < 60
+    
+    clock.jump(10 * 3600)
+    assert scheduler.wait_due() == [evening]
+    assert scheduler.clock_jumps == 2
+
+def test_upcoming_only_returns_reminders_inside_the_horizon():
+    clock, scheduler = make_scheduler(at(hour=8, minute=55))
+    soon = [vr.make_reminder(f"soon {i}", f"09:0{i}") for i in range(5)]
+    later = [vr.make_reminder(f"later {i}", f"1{i}:00") for i in range(5)]
+    scheduler.add_many(later + soon)
+    scheduler.remove(soon[0])
+    
+    upcoming = scheduler.upcoming(10 * 60)
+    
+    assert sorted(reminder["text"] for reminder in upcoming) == ["soon 1", "soon 2", "soon 3", "soon 4"]
+
+def test_repeating_reminder_fires_every_interval():
+    clock, scheduler = make_scheduler(at(hour=8, minute=59))
+    reminder = vr.make_reminder("stretch", "09:00", "every 15 minutes", start=MONDAY.date().isoformat())
+    scheduler.add(reminder)
+    
+    fired = drain(clock, scheduler, at(hour=10, minute=1))
+    
+    assert len(fired) == 5
+    assert len(scheduler) == 1
+
+def test_weekdays_skip_the_weekend():
+    clock, scheduler = make_scheduler(at(hour=6))
+    reminder = vr.make_reminder("standup", "09:30", "weekdays", start=MONDAY.date().isoformat())
+    scheduler.add(reminder)
+    
+    fired = drain(clock, scheduler, at(day=7, hour=6))
+    
+    days = [datetime.datetime.fromtimestamp(when).weekday() for _, when in fired]
+    assert days == [0, 1, 2, 3, 4]
+
+@pytest.mark.parametrize("text, expected", [
+    ("daily", "FREQ=DAILY"),
+    ("weekdays", "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"),
+    ("every 5 minutes", "FREQ=MINUTELY;INTERVAL=5"),
+    ("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=FR,MO;COUNT=3", "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR;COUNT=3"),
+])
+def test_recurrence_rule_round_trips(text, expected):
+    assert str(vr.RecurrenceRule.parse(text)) == expected
+
+@pytest.mark.parametrize("text", ["FREQ=YEARLY", "FREQ=DAILY;INTERVAL=0", "FREQ=WEEKLY;BYDAY=XX", "BYDAY=MO"])
+def test_invalid_recurrence_rules_are_rejected(text):
+    with pytest.raises(ValueError):
+        vr.RecurrenceRule.parse(text)
+
+def test_count_and_until_end_the_series():
+    counted = vr.make_reminder("counted", "09:00", "FREQ=DAILY;COUNT=3", start=MONDAY.date().isoformat())
+    until = vr.make_reminder("until", "09:00", "FREQ=DAILY;UNTIL=20240102", start=MONDAY.date().isoformat())
+    
+    def fire_times(reminder):
+        times = []
+        now = at()
+        while True:
+            fire_time = vr.next_fire_time(reminder, now, after=now)
+            if fire_time is None:
+                return times
+            times.append(fire_time)
+            now = fire_time
+    
+    assert fire_times(counted) == [at(day=0, hour=9), at(day=1, hour=9), at(day=2, hour=9)]
+    assert fire_times(until) == [at(day=0, hour=9), at(day=1, hour=9)]
+
+def test_finish_occurrence_deactivates_one_off_reminders():
+    once = vr.make_reminder("once", "09:00")
+    daily = vr.make_reminder("daily", "09:00", "daily", start=MONDAY.date().isoformat())
+    
+    vr.finish_occurrence(once, at(hour=9))
+    vr.finish_occurrence(daily, at(hour=9))
+    
+    assert once["active"] is False
+    assert daily["active"] is True
\ No newline at end of file
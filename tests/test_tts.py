@@ -0,0 +1,59 @@
+import base64
+
+import pytest
+
+import virtualreminder as vr
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+    
+    def raise_for_status(self):
+        pass
+
+class FakeSession:
+    def __init__(self, text):
+        self.text = text
+        self.sent = []
+    
+    def send(self, prepared, timeout=None):
+        self.sent.append(prepared)
+        return FakeResponse(self.text)
+    
+    def close(self):
+        pass
+
+def batch_response(audio):
+    payload = base64.b64encode(audio).decode("ascii")
+    return ")]}'\n\n" + '[["wrb.fr","jQ1olc","[\\"' + payload + '\\"]",null,null,null,"generic"]]\n'
+
+@pytest.fixture
+def service(monkeypatch):
+    service = vr.GTTSSynthesisService(max_workers=2)
+    monkeypatch.setattr(service, "_synthesize_plain", lambda text, language: b"plain:" + text.encode())
+    monkeypatch.setattr(service, "_prepare", lambda text, language: [text])
+    yield service
+    service.close()
+
+def test_pooled_requests_decode_the_batch_response(service):
+    service.session = FakeSession(batch_response(b"pooled audio"))
+    
+    assert service.synthesize_batch(["one", "two"], "en") == [b"pooled audio", b"pooled audio"]
+    assert service.session.sent == ["one", "two"]
+
+def test_missing_gtts_internals_fall_back_to_plain_gtts(service, monkeypatch):
+    def prepare(text, language):
+        raise AttributeError("'gTTS' object has no attribute '_prepare_requests'")
+    monkeypatch.setattr(service, "_prepare", prepare)
+    
+    assert service.synthesize_batch(["one", "two"], "en") == [b"plain:one", b"plain:two"]
+
+@pytest.mark.parametrize("text", [
+    "<html>unexpected</html>",
+    '[["wrb.fr","jQ1olc",null]]',
+    '[["wrb.fr","jQ1olc","[\\"not base64!\\"]"]]',
+])
+def test_unparseable_responses_fall_back_to_plain_gtts(service, text):
+    service.session = FakeSession(text)
+    
+    assert service.synthesize("hello", "en") == b"plain:hello"
\ No newline at end of file
@@ -1,190 +1,2925 @@
 import sys
 import os
+import argparse
+import copy
 import time
 import datetime
+import io
 import json
 import tempfile
+import re
+import math
+import wave
+import base64
+import urllib.parse
+import array
+import shutil
+import hashlib
+import heapq
+import itertools
+import bisect
+import collections
+import threading
+import queue
+import sqlite3
+import subprocess
+import importlib
+import importlib.util
+import functools
+import signal
+import socket
+import gc
+import weakref
+import tracemalloc
+import csv
+from collections import OrderedDict
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                             QLabel, QPushButton, QTimeEdit, QFileDialog,
                             QTextEdit, QSystemTrayIcon, QMenu, QAction,
-                            QDesktopWidget, QComboBox, QSlider, QGroupBox)
-from PyQt5.QtCore import Qt, QTimer, QTime, QThread, pyqtSignal, QSize, QPoint
-from PyQt5.QtGui import QIcon, QPixmap, QFont, QPainter, QMovie
-import pygame
-from gtts import gTTS
-from pydub import AudioSegment
-from pydub.effects import speedup
-
-class AnimeVoicePlayer(QThread):
-    finished = pyqtSignal()
-    
-    def __init__(self, text, voice_settings=None):
-        super().__init__()
+                            QDesktopWidget, QComboBox, QSlider, QGroupBox,
+                            QLineEdit, QTableView, QHeaderView, QAbstractItemView, QMessageBox,
+                            QCheckBox)
+from PyQt5.QtCore import (Qt, QCoreApplication, QSocketNotifier, QTimer, QTime, QThread, QObject, pyqtSignal, QSize, QPoint, QRect, QEvent,
+                          QAbstractTableModel, QSortFilterProxyModel, QModelIndex)
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from PyQt5.QtGui import QIcon, QPixmap, QImageReader, QFont, QFontMetrics, QPainter
+
+class LazyModule:
+    def __init__(self, name, attribute=None):
+        self._name = name
+        self._attribute = attribute
+        self._target = None
+        self._lock = threading.Lock()
+    
+    def load(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    module = importlib.import_module(self._name)
+                    self._target = getattr(module, self._attribute) if self._attribute else module
+        return self._target
+    
+    def is_loaded(self):
+        return self._target is not None
+    
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+    
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+pygame = LazyModule("pygame")
+requests = LazyModule("requests")
+gTTS = LazyModule("gtts", "gTTS")
+AudioSegment = LazyModule("pydub", "AudioSegment")
+speedup = LazyModule("pydub.effects", "speedup")
+
+np = LazyModule("numpy") if importlib.util.find_spec("numpy") else None
+
+class StageStats:
+    def __init__(self, buckets, window):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+        index = bisect.bisect_left(self.buckets, seconds)
+        if index < len(self.counts):
+            self.counts[index] += 1
+    
+    def snapshot(self):
+        ordered = sorted(self.samples)
+        
+        def percentile(fraction):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+        
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": self.max,
+            "buckets": dict(zip(self.buckets, itertools.accumulate(self.counts)))
+        }
+
+class _Span:
+    __slots__ = ("tracer", "stage", "start")
+    
+    def __init__(self, tracer, stage):
+        self.tracer = tracer
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class LatencyTracer:
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    MAX_MARKS = 256
+    
+    def __init__(self, enabled=False, window=1024):
+        self.enabled = enabled
+        self.window = window
+        self.lock = threading.Lock()
+        self.stages = OrderedDict()
+        self.marks = OrderedDict()
+    
+    def span(self, stage):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, stage)
+    
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.BUCKETS, self.window)
+            stats.add(seconds)
+    
+    def mark(self, key):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.marks[key] = time.perf_counter()
+            if len(self.marks) > self.MAX_MARKS:
+                self.marks.popitem(last=False)
+    
+    def finish(self, key, stage):
+        if not self.enabled:
+            return
+        with self.lock:
+            started = self.marks.pop(key, None)
+        if started is not None:
+            self.record(stage, time.perf_counter() - started)
+    
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            self.marks.clear()
+    
+    def snapshot(self):
+        with self.lock:
+            return OrderedDict((stage, stats.snapshot()) for stage, stats in self.stages.items())
+    
+    def to_json(self):
+        snapshot = self.snapshot()
+        for stats in snapshot.values():
+            stats["buckets"] = {str(bound): count for bound, count in stats["buckets"].items()}
+        return json.dumps({"enabled": self.enabled, "stages": snapshot}, indent=2)
+    
+    def to_prometheus(self, name="anime_reminder_stage_seconds"):
+        lines = [f"# HELP {name} Latency of each reminder-to-speech stage.",
+                 f"# TYPE {name} histogram"]
+        for stage, stats in self.snapshot().items():
+            for bound, count in stats["buckets"].items():
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+default_tracer = LatencyTracer()
+
+TEMP_PREFIX = "anime_reminder_tmp_"
+
+class ResourceMonitor:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sources = weakref.WeakValueDictionary()
+        self.threads = weakref.WeakValueDictionary()
+    
+    def add_source(self, name, source):
+        with self.lock:
+            self.sources[name] = source
+    
+    def track_thread(self, name, thread):
+        with self.lock:
+            self.threads[name] = thread
+    
+    def memory(self):
+        usage = {"python_objects": len(gc.get_objects())}
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in ("VmRSS", "VmHWM"):
+                        usage["rss_bytes" if key == "VmRSS" else "peak_rss_bytes"] = int(value.split()[0]) * 1024
+        except OSError:
+            pass
+        return usage
+    
+    def threads_report(self):
+        with self.lock:
+            tracked = list(self.threads.items())
+        return {
+            "python": sorted(thread.name for thread in threading.enumerate()),
+            "qt": {name: thread.isRunning() for name, thread in sorted(tracked)}
+        }
+    
+    def temp_files(self):
+        directory = tempfile.gettempdir()
+        try:
+            return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                          if name.startswith(TEMP_PREFIX))
+        except OSError:
+            return []
+    
+    def files_report(self):
+        report = {"fds": None, "open_temp_files": [], "temp_files": self.temp_files()}
+        try:
+            names = os.listdir("/proc/self/fd")
+        except OSError:
+            return report
+        
+        targets = []
+        for name in names:
+            try:
+                targets.append(os.readlink(os.path.join("/proc/self/fd", name)))
+            except OSError:
+                pass
+        report["fds"] = len(targets)
+        report["open_temp_files"] = sorted(target for target in targets
+                                           if os.path.basename(target).startswith(TEMP_PREFIX)
+                                           or target.endswith(".tmp"))
+        return report
+    
+    def start_allocation_tracing(self, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+    
+    def stop_allocation_tracing(self):
+        tracemalloc.stop()
+    
+    def top_allocations(self, limit=10):
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+        return {
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "top": [{"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                     "bytes": stat.size, "blocks": stat.count}
+                    for stat in snapshot.statistics("lineno")[:limit]]
+        }
+    
+    def snapshot(self, top=10):
+        with self.lock:
+            sources = sorted(self.sources.items())
+        report = OrderedDict()
+        report["memory"] = self.memory()
+        report["threads"] = self.threads_report()
+        report["files"] = self.files_report()
+        for name, source in sources:
+            try:
+                report[name] = source.stats()
+            except Exception as e:
+                report[name] = {"error": str(e)}
+        report["allocations"] = self.top_allocations(top)
+        return report
+    
+    def to_json(self, top=10):
+        return json.dumps(self.snapshot(top), indent=2)
+
+default_resources = ResourceMonitor()
+
+def segment_to_samples(audio):
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[audio.sample_width]
+    scale = float(2 ** (8 * audio.sample_width - 1))
+    samples = np.frombuffer(audio.raw_data, dtype=dtype).astype(np.float32) / scale
+    return samples.reshape(-1, audio.channels).T
+
+def samples_to_segment(samples, audio):
+    pcm = np.clip(samples.T.reshape(-1), -1.0, 1.0 - 1.0 / 32768)
+    pcm = (pcm * 32768).astype(np.int16)
+    return audio._spawn(pcm.tobytes(), overrides={"sample_width": 2})
+
+def _overlap_add(frames, hop):
+    frame_length = frames.shape[1]
+    output = np.zeros(hop * (len(frames) - 1) + frame_length, dtype=frames.dtype)
+    stride = frame_length // hop
+    for offset in range(stride):
+        tiled = frames[offset::stride].reshape(-1)
+        start = offset * hop
+        output[start:start + len(tiled)] += tiled
+    return output
+
+def time_stretch(samples, rate, frame_length=1024, hop=256):
+    if rate == 1.0 or len(samples) == 0:
+        return samples
+    
+    window = np.hanning(frame_length).astype(np.float32)
+    padded = np.pad(samples, (frame_length // 2, frame_length))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop]
+    spectrum = np.fft.rfft(frames * window, axis=1).astype(np.complex64, copy=False)
+    
+    steps = np.arange(0, len(spectrum) - 1, rate)
+    index = steps.astype(np.intp)
+    fraction = (steps - index).astype(np.float32)[:, None]
+    magnitude = np.abs(spectrum)
+    magnitude = magnitude[index] + fraction * (magnitude[index + 1] - magnitude[index])
+    
+    expected = (2 * np.pi * hop / frame_length * np.arange(spectrum.shape[1])).astype(np.float32)
+    angles = np.angle(spectrum)
+    advance = angles[index + 1] - angles[index] - expected
+    advance -= np.float32(2 * np.pi) * np.round(advance * np.float32(1 / (2 * np.pi)))
+    advance += expected
+    phase = np.empty_like(magnitude)
+    phase[0] = angles[0]
+    np.cumsum(advance[:-1], axis=0, out=phase[1:])
+    phase[1:] += angles[0]
+    
+    synthesis = np.empty(magnitude.shape, dtype=np.complex64)
+    np.multiply(magnitude, np.cos(phase), out=synthesis.real)
+    np.multiply(magnitude, np.sin(phase), out=synthesis.imag)
+    stretched = np.fft.irfft(synthesis, n=frame_length, axis=1).astype(np.float32, copy=False) * window
+    output = _overlap_add(stretched, hop)
+    envelope = _overlap_add(np.tile(window ** 2, (len(stretched), 1)), hop)
+    output /= np.maximum(envelope, 1e-3)
+    
+    length = int(round(len(samples) / rate))
+    return output[frame_length // 2:frame_length // 2 + length]
+
+def resample(samples, factor):
+    if factor == 1.0 or len(samples) == 0:
+        return samples
+    positions = np.arange(0, len(samples) - 1, factor)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def change_speed_and_pitch(samples, speed, pitch):
+    return np.stack([time_stretch(resample(channel, pitch), speed / pitch)
+                     for channel in samples])
+
+def split_sentences(text):
+    sentences = re.split(r"(?<=[.!?;,])\s+|(?<=[\u3001\u3002\uff01\uff0c\uff1f])\s*", text)
+    return [sentence.strip() for sentence in sentences if sentence.strip()] or [text]
+
+class TTSBackend:
+    name = ""
+    audio_format = "wav"
+    remote = False
+    automatic = True
+    
+    def is_available(self):
+        return True
+    
+    def synthesize(self, text, language):
+        raise NotImplementedError
+
+    def synthesize_batch(self, texts, language):
+        return [self.synthesize(text, language) for text in texts]
+
+class GTTSSynthesisService:
+    def __init__(self, max_workers=4, timeout=10.0, base_url=None):
+        self.timeout = timeout
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.session = None
+        self.session_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gtts")
+    
+    def synthesize(self, text, language):
+        return self.synthesize_batch([text], language)[0]
+    
+    def synthesize_batch(self, texts, language):
+        try:
+            return self._synthesize_pooled(texts, language)
+        except (AttributeError, TypeError, ValueError, RuntimeError) as e:
+            print(f"gTTS request pooling unavailable, using gTTS directly: {e}")
+            return [self._synthesize_plain(text, language) for text in texts]
+    
+    def _synthesize_plain(self, text, language):
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=language, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+    
+    def _synthesize_pooled(self, texts, language):
+        jobs = []
+        for index, text in enumerate(texts):
+            for prepared in self._prepare(text, language):
+                jobs.append((index, self.executor.submit(self._fetch, prepared)))
+        
+        parts = [[] for _ in texts]
+        for index, future in jobs:
+            parts[index].append(future.result())
+        return [b"".join(chunks) for chunks in parts]
+    
+    def _prepare(self, text, language):
+        prepared_requests = gTTS(text=text, lang=language, slow=False)._prepare_requests()
+        if self.base_url:
+            base = urllib.parse.urlsplit(self.base_url)
+            for prepared in prepared_requests:
+                url = urllib.parse.urlsplit(prepared.url)
+                prepared.url = urllib.parse.urlunsplit(
+                    (base.scheme, base.netloc, url.path, url.query, url.fragment))
+        return prepared_requests
+    
+    def _open_session(self):
+        with self.session_lock:
+            if self.session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.session = session
+            return self.session
+    
+    def _fetch(self, prepared):
+        response = self._open_session().send(prepared, timeout=self.timeout)
+        response.raise_for_status()
+        
+        audio = []
+        for line in response.text.splitlines():
+            if "jQ1olc" in line:
+                match = re.search(r'jQ1olc","\[\\"(.*)\\"]', line)
+                if not match:
+                    raise RuntimeError("No audio in TTS response")
+                audio.append(base64.b64decode(match.group(1), validate=True))
+        if not audio:
+            raise RuntimeError("No audio in TTS response")
+        return b"".join(audio)
+    
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if self.session is not None:
+            self.session.close()
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+    audio_format = "mp3"
+    remote = True
+    
+    def __init__(self, timeout=10.0, service=None):
+        self.service = service or GTTSSynthesisService(timeout=timeout)
+    
+    def synthesize(self, text, language):
+        return self.service.synthesize(text, language)
+    
+    def synthesize_batch(self, texts, language):
+        return self.service.synthesize_batch(texts, language)
+
+class EspeakBackend(TTSBackend):
+    name = "espeak"
+    voices = {"ja": "ja", "en": "en", "ko": "ko", "zh-CN": "cmn"}
+    
+    def __init__(self):
+        self.executable = shutil.which("espeak-ng") or shutil.which("espeak")
+    
+    def is_available(self):
+        return self.executable is not None
+    
+    def synthesize(self, text, language):
+        result = subprocess.run(
+            [self.executable, "-v", self.voices.get(language, "en"), "--stdout", text],
+            capture_output=True, check=True, timeout=30)
+        return result.stdout
+
+class SineBackend(TTSBackend):
+    name = "sine"
+    automatic = False
+    frame_rate = 24000
+    vowels = {"a": (730, 1090), "e": (530, 1840), "i": (270, 2290),
+              "o": (570, 840), "u": (300, 870), "y": (270, 2290)}
+    
+    def synthesize(self, text, language):
+        samples = array.array("h")
+        for word in text.lower().split():
+            for letter in word:
+                if letter in self.vowels:
+                    self._tone(samples, self.vowels[letter], 0.09)
+                elif letter.isalnum():
+                    self._tone(samples, (180, 0), 0.03)
+            samples.extend([0] * int(self.frame_rate * 0.05))
+        
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as output:
+            output.setnchannels(1)
+            output.setsampwidth(2)
+            output.setframerate(self.frame_rate)
+            output.writeframes(samples.tobytes())
+        return buffer.getvalue()
+    
+    def _tone(self, samples, formants, duration):
+        first, second = formants
+        count = int(self.frame_rate * duration)
+        step = 2 * math.pi / self.frame_rate
+        for n in range(count):
+            envelope = math.sin(math.pi * n / count)
+            value = 0.6 * math.sin(first * n * step) + 0.3 * math.sin(second * n * step)
+            samples.append(int(8000 * envelope * value))
+
+class TTSManager:
+    def __init__(self, backends=None, timeout=8.0):
+        backends = backends or [GTTSBackend(timeout), EspeakBackend(), SineBackend()]
+        self.backends = OrderedDict((backend.name, backend) for backend in backends)
+        self.timeout = timeout
+        self.latency = {}
+        self.calls = {}
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts")
+    
+    def candidates(self, preferred):
+        available = [backend for backend in self.backends.values() if backend.is_available()]
+        if preferred == "auto":
+            order = sorted((backend for backend in available if backend.automatic),
+                           key=lambda backend: self.latency.get(backend.name, 0.0))
+        else:
+            order = [backend for backend in available if backend.name == preferred]
+        
+        for backend in available:
+            if not backend.remote and backend not in order:
+                order.append(backend)
+        return order
+    
+    def synthesize(self, text, language, preferred="gtts"):
+        for backend in self.candidates(preferred):
+            start = time.perf_counter()
+            try:
+                if backend.remote:
+                    future = self.executor.submit(backend.synthesize, text, language)
+                    data = future.result(timeout=self.timeout)
+                else:
+                    data = backend.synthesize(text, language)
+            except FutureTimeoutError:
+                print(f"TTS backend {backend.name} timed out, falling back")
+                self._record(backend.name, None)
+                continue
+            except Exception as e:
+                print(f"TTS backend {backend.name} failed: {e}")
+                self._record(backend.name, None)
+                continue
+            
+            self._record(backend.name, time.perf_counter() - start)
+            return data, backend.audio_format, backend.name
+        
+        raise RuntimeError("No TTS backend available")
+    
+    def synthesize_batch(self, texts, language, preferred="gtts"):
+        backend = self.backends.get(preferred)
+        if not texts or backend is None or not backend.is_available():
+            return [None] * len(texts)
+        
+        start = time.perf_counter()
+        try:
+            if backend.remote:
+                future = self.executor.submit(backend.synthesize_batch, texts, language)
+                datas = future.result(timeout=self.timeout * len(texts))
+            else:
+                datas = backend.synthesize_batch(texts, language)
+        except Exception as e:
+            print(f"TTS backend {backend.name} batch failed: {e}")
+            self._record(backend.name, None)
+            return [None] * len(texts)
+        
+        self._record(backend.name, (time.perf_counter() - start) / len(texts))
+        return [(data, backend.audio_format, backend.name) for data in datas]
+    
+    def _record(self, name, elapsed):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if elapsed is None:
+                self.failures[name] = self.failures.get(name, 0) + 1
+                elapsed = self.timeout
+            previous = self.latency.get(name)
+            self.latency[name] = elapsed if previous is None else 0.7 * previous + 0.3 * elapsed
+    
+    def stats(self):
+        with self.lock:
+            return {
+                name: {
+                    "available": backend.is_available(),
+                    "latency_ms": round(self.latency[name] * 1000, 1) if name in self.latency else None,
+                    "calls": self.calls.get(name, 0),
+                    "failures": self.failures.get(name, 0)
+                }
+                for name, backend in self.backends.items()
+            }
+
+default_tts = TTSManager()
+default_resources.add_source("tts", default_tts)
+
+class AudioCache:
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+    
+    def _scan(self):
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            elif name.endswith(".wav"):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, name[:-4], stat.st_size))
+        
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+    
+    @staticmethod
+    def make_key(text, settings):
+        payload = json.dumps([
+            text,
+            settings["language"],
+            settings["speed"],
+            settings["pitch"],
+            settings["add_words"],
+            settings["tts_backend"],
+            settings.get("dsp")
+        ])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def path_for(self, key):
+        return os.path.join(self.directory, key + ".wav")
+    
+    def get(self, key):
+        path = self.path_for(key)
+        with self.lock:
+            if key in self.entries and os.path.exists(path):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return path
+            
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)
+            self.misses += 1
+            return None
+    
+    def contains(self, key):
+        with self.lock:
+            return key in self.entries and os.path.exists(self.path_for(key))
+    
+    def store(self, key, write):
+        path = self.path_for(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        size = os.path.getsize(path)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)
+            self.entries[key] = size
+            self.total_bytes += size
+            self._evict(keep=key)
+        return path
+    
+    def _evict(self, keep):
+        for key in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                continue
+            self.total_bytes -= self.entries.pop(key)
+    
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes
+            }
+
+class Playback:
+    def __init__(self, sound, channel, deadline, on_finished=None):
+        self.sound = sound
+        self.channel = channel
+        self.deadline = deadline
+        self.on_finished = on_finished
+        self.done = threading.Event()
+    
+    def is_playing(self):
+        return (self.channel is not None and self.channel.get_busy()
+                and self.channel.get_sound() is self.sound)
+    
+    def finish(self):
+        self.done.set()
+        if self.on_finished is not None:
+            self.on_finished()
+    
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+class PlaybackEngine:
+    FREQUENCY = 44100
+    SIZE = -16
+    CHANNELS = 1
+    
+    def __init__(self, memory_budget=32 * 1024 * 1024):
+        self.memory_budget = memory_budget
+        self.sounds = OrderedDict()
+        self.sound_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.init_lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.pending = []
+        self.counter = itertools.count()
+        self.watcher = None
+    
+    def ensure_init(self):
+        with self.init_lock:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(frequency=self.FREQUENCY, size=self.SIZE,
+                                  channels=self.CHANNELS, buffer=1024)
+    
+    def to_output_format(self, audio):
+        return (audio.set_frame_rate(self.FREQUENCY)
+                     .set_channels(self.CHANNELS)
+                     .set_sample_width(abs(self.SIZE) // 8))
+    
+    def get(self, key):
+        with self.lock:
+            sound = self.sounds.get(key)
+            if sound is None:
+                self.misses += 1
+                return None
+            self.sounds.move_to_end(key)
+            self.hits += 1
+            return sound[0]
+    
+    def load_file(self, filename, key=None):
+        self.ensure_init()
+        with default_tracer.span("mixer_load"):
+            sound = pygame.mixer.Sound(filename)
+        frequency, size, channels = pygame.mixer.get_init()
+        self._remember(key, sound, int(sound.get_length() * frequency * channels * abs(size) // 8))
+        return sound
+    
+    def load_segment(self, audio, key=None):
+        self.ensure_init()
+        frequency, size, channels = pygame.mixer.get_init()
+        if (audio.frame_rate, audio.channels, audio.sample_width) != (frequency, channels, abs(size) // 8):
+            audio = audio.set_frame_rate(frequency).set_channels(channels).set_sample_width(abs(size) // 8)
+        with default_tracer.span("mixer_load"):
+            sound = pygame.mixer.Sound(buffer=audio.raw_data)
+        self._remember(key, sound, len(audio.raw_data))
+        return sound
+    
+    def _remember(self, key, sound, size):
+        if key is None or size > self.memory_budget:
+            return
+        with self.lock:
+            if key in self.sounds:
+                self.sound_bytes -= self.sounds.pop(key)[1]
+            self.sounds[key] = (sound, size)
+            self.sound_bytes += size
+            while self.sound_bytes > self.memory_budget:
+                _, (_, evicted_size) = self.sounds.popitem(last=False)
+                self.sound_bytes -= evicted_size
+    
+    def play(self, sound, on_finished=None):
+        self.ensure_init()
+        with default_tracer.span("playback_start"):
+            channel = sound.play()
+        playback = Playback(sound, channel, time.monotonic() + sound.get_length(), on_finished)
+        if channel is None:
+            playback.finish()
+        else:
+            self._watch(playback)
+        return playback
+    
+    def play_next(self, previous, sound, on_finished=None):
+        channel = previous.channel
+        if channel is None or not previous.is_playing() or channel.get_queue() is not None:
+            previous.wait()
+            return self.play(sound, on_finished)
+        
+        channel.queue(sound)
+        playback = Playback(sound, channel, previous.deadline + sound.get_length(), on_finished)
+        self._watch(playback)
+        return playback
+    
+    def _watch(self, playback):
+        with self.condition:
+            heapq.heappush(self.pending, (playback.deadline, next(self.counter), playback))
+            if self.watcher is None:
+                self.watcher = threading.Thread(target=self._run_watcher, name="playback-events",
+                                                daemon=True)
+                self.watcher.start()
+            self.condition.notify()
+    
+    def _run_watcher(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                deadline, _, playback = self.pending[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                heapq.heappop(self.pending)
+            
+            if playback.is_playing() or (playback.channel is not None
+                                         and playback.channel.get_queue() is playback.sound):
+                playback.deadline = time.monotonic() + 0.02
+                with self.condition:
+                    heapq.heappush(self.pending, (playback.deadline, next(self.counter), playback))
+                continue
+            playback.finish()
+    
+    def stats(self):
+        with self.lock:
+            return {
+                "sounds": len(self.sounds),
+                "bytes": self.sound_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+default_playback = PlaybackEngine()
+default_resources.add_source("playback", default_playback)
+
+def warm_up_audio(playback=None):
+    try:
+        for module in (AudioSegment, speedup, gTTS):
+            module.load()
+        (playback or default_playback).ensure_init()
+    except Exception as e:
+        print(f"Error initializing audio: {e}")
+
+def apply_voice_effects(audio, settings):
+    if settings["dsp"] == "numpy":
+        if np is not None:
+            return apply_voice_effects_numpy(audio, settings)
+        print("NumPy not available, using pydub effects")
+    
+    if settings["speed"] != 1.0:
+        audio = speedup(audio, settings["speed"], 150)
+    
+    if settings["pitch"] != 1.0:
+        try:
+            from pydub.effects import pitch_shift
+            semitones = (settings["pitch"] - 1.0) * 12
+            audio = pitch_shift(audio, semitones)
+        except (ImportError, AttributeError):
+            print("Sox not available for pitch shifting, using alternative approach")
+            faster = settings["pitch"]
+            audio = audio._spawn(audio.raw_data, overrides={
+                "frame_rate": int(audio.frame_rate * faster)
+            })
+            audio = audio.set_frame_rate(44100)
+    
+    return audio
+
+def apply_voice_effects_numpy(audio, settings):
+    speed = settings["speed"]
+    pitch = settings["pitch"]
+    if speed == 1.0 and pitch == 1.0:
+        return audio
+    
+    samples = change_speed_and_pitch(segment_to_samples(audio), speed, pitch)
+    return samples_to_segment(samples, audio)
+
+def process_speech(data, audio_format, settings):
+    audio = AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+    return default_playback.to_output_format(apply_voice_effects(audio, settings))
+
+def _offload_warm_up():
+    for module in (AudioSegment, speedup):
+        module.load()
+    if np is not None:
+        np.load()
+    return os.getpid()
+
+def _offload_process_speech(data, audio_format, settings):
+    audio = process_speech(data, audio_format, settings)
+    raw = audio.raw_data
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(raw)))
+    try:
+        block.buf[:len(raw)] = raw
+    finally:
+        block.close()
+    return block.name, len(raw), audio.frame_rate, audio.channels, audio.sample_width
+
+class AudioOffload:
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.executor = None
+        self.lock = threading.Lock()
+        self.jobs = 0
+        self.failures = 0
+    
+    def start(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+                for _ in range(self.workers):
+                    self.executor.submit(_offload_warm_up)
+            return self.executor
+    
+    def process(self, data, audio_format, settings):
+        executor = self.start()
+        try:
+            future = executor.submit(_offload_process_speech, data, audio_format, dict(settings))
+            name, size, frame_rate, channels, sample_width = future.result()
+        except BrokenProcessPool as e:
+            with self.lock:
+                self.failures += 1
+                if self.executor is executor:
+                    self.executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            print(f"Audio offload worker died, processing in-process: {e}")
+            return process_speech(data, audio_format, settings)
+        except Exception:
+            with self.lock:
+                self.failures += 1
+            raise
+        
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            raw = bytes(block.buf[:size])
+        finally:
+            block.close()
+            block.unlink()
+        with self.lock:
+            self.jobs += 1
+        return AudioSegment(data=raw, frame_rate=frame_rate, channels=channels, sample_width=sample_width)
+    
+    def shutdown(self, wait=True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self):
+        with self.lock:
+            running = self.executor is not None
+        return {
+            "running": running,
+            "workers": self.workers,
+            "jobs": self.jobs,
+            "failures": self.failures
+        }
+
+default_offload = AudioOffload()
+default_resources.add_source("offload", default_offload)
+
+class AnimeVoicePlayer:
+    def __init__(self, text, voice_settings=None, cache=None, tts=None, playback=None, offload=None):
         self.text = text
+        self.cache = cache
+        self.tts = tts or default_tts
+        self.playback = playback or default_playback
+        self.offload = offload or default_offload
+        self.fallback_used = False
+        self.started_at = None
+        self.time_to_first_audio = None
         
         self.settings = {
             "language": "ja",
             "speed": 1.2,
             "pitch": 1.3,
-            "add_words": True
+            "add_words": True,
+            "pipeline": "memory",
+            "dsp": "pydub",
+            "tts_backend": "gtts",
+            "streaming": False,
+            "offload": False
+        }
+        
+        if voice_settings:
+            self.settings.update(voice_settings)
+    
+    def speak(self):
+        self.started_at = time.perf_counter()
+        self.time_to_first_audio = None
+        try:
+            sound = self.playback.get(self.sound_key())
+            if sound is not None:
+                self._play_sound(sound)
+            elif self.settings["pipeline"] == "memory":
+                self._run_in_memory()
+            else:
+                self._run_with_files()
+        except Exception as e:
+            print(f"Error in voice playback: {e}")
+    
+    def cache_key(self):
+        return self.cache.make_key(self._add_anime_phrases(self.text), self.settings)
+    
+    def sound_key(self):
+        return AudioCache.make_key(self._add_anime_phrases(self.text), self.settings)
+    
+    def is_rendered(self):
+        return self.cache.contains(self.cache_key())
+    
+    def render(self, speech=None):
+        cache_key = self.cache_key()
+        cached_file = self.cache.get(cache_key)
+        if cached_file:
+            return cached_file
+        
+        audio = self.render_segment(speech)
+        if self.fallback_used:
+            return None
+        return self._store_segment(cache_key, audio)
+    
+    def render_segment(self, speech=None):
+        if speech is None:
+            data, audio_format = self._synthesize(self._add_anime_phrases(self.text))
+        else:
+            data, audio_format, _ = speech
+            self.fallback_used = False
+        return self._process_segment(data, audio_format)
+    
+    def _run_in_memory(self):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache_key()
+            cached_file = self.cache.get(cache_key)
+            if cached_file:
+                self._play_speech_file(cached_file, cache_key)
+                return
+        
+        if self.settings["streaming"]:
+            audio = self._stream_segments()
+        else:
+            audio = self.render_segment()
+            if cache_key is not None and not self.fallback_used:
+                self._store_segment(cache_key, audio)
+            self._play_segment(audio, None if self.fallback_used else self.sound_key())
+            return
+        
+        if cache_key is not None and audio is not None and not self.fallback_used:
+            self._store_segment(cache_key, audio)
+    
+    def _stream_segments(self):
+        sentences = split_sentences(self._add_anime_phrases(self.text))
+        speech_queue = queue.Queue(maxsize=2)
+        sound_queue = queue.Queue(maxsize=2)
+        processed = []
+        fallback_used = [False]
+        cancelled = threading.Event()
+        
+        def put(target, item):
+            while not cancelled.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def synthesize():
+            try:
+                for sentence in sentences:
+                    if not put(speech_queue, self._synthesize(sentence)):
+                        return
+                    fallback_used[0] = fallback_used[0] or self.fallback_used
+                put(speech_queue, None)
+            except Exception as e:
+                put(speech_queue, e)
+        
+        def process():
+            try:
+                while not cancelled.is_set():
+                    try:
+                        item = speech_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if item is None or isinstance(item, Exception):
+                        put(sound_queue, item)
+                        return
+                    audio = self._process_segment(*item)
+                    processed.append(audio)
+                    if not put(sound_queue, self._load_segment(audio)):
+                        return
+            except Exception as e:
+                put(sound_queue, e)
+        
+        workers = [threading.Thread(target=synthesize, daemon=True),
+                   threading.Thread(target=process, daemon=True)]
+        for worker in workers:
+            worker.start()
+        
+        try:
+            playing = []
+            while True:
+                sound = sound_queue.get()
+                if sound is None:
+                    break
+                if isinstance(sound, Exception):
+                    raise sound
+                
+                if not playing:
+                    playing.append(self.playback.play(sound))
+                    self._mark_first_audio()
+                else:
+                    if len(playing) > 1:
+                        playing[-2].wait()
+                    playing.append(self.playback.play_next(playing[-1], sound))
+                    playing = playing[-2:]
+            
+            if playing:
+                playing[-1].wait()
+        finally:
+            cancelled.set()
+            for worker in workers:
+                worker.join(timeout=1.0)
+        
+        self.fallback_used = fallback_used[0]
+        if len(processed) != len(sentences):
+            return None
+        return sum(processed[1:], processed[0])
+    
+    def _store_segment(self, cache_key, audio):
+        with default_tracer.span("export"):
+            return self.cache.store(cache_key, lambda path: audio.export(path, format="wav").close())
+    
+    def _run_with_files(self):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache_key()
+            cached_file = self.cache.get(cache_key)
+            if cached_file:
+                self._play_speech_file(cached_file, cache_key)
+                return
+        
+        temp_files = []
+        try:
+            for suffix in ('.mp3', '.wav'):
+                fd, path = tempfile.mkstemp(prefix=TEMP_PREFIX, suffix=suffix)
+                os.close(fd)
+                temp_files.append(path)
+            temp_file, processed_file = temp_files
+        
+            audio_format = self._generate_speech_file(self._add_anime_phrases(self.text), temp_file)
+            self._process_audio(temp_file, processed_file, audio_format)
+            if cache_key is not None and not self.fallback_used:
+                self.cache.store(cache_key, lambda path: shutil.copyfile(processed_file, path))
+            self._play_speech_file(processed_file, None if self.fallback_used else self.sound_key())
+        finally:
+            for path in temp_files:
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def _add_anime_phrases(self, text):
+        if not self.settings["add_words"]:
+            return text
+            
+        if any(word in text.lower() for word in ["desu", "nya", "chan", "kun", "senpai"]):
+            return text
+            
+        import random
+        anime_endings = ["desu", "ne", "yo"]
+        return text + " " + random.Random(text).choice(anime_endings)
+    
+    def _generate_speech_file(self, text, filename):
+        data, audio_format = self._synthesize(text)
+        with open(filename, 'wb') as f:
+            f.write(data)
+        return audio_format
+    
+    def _synthesize(self, text):
+        try:
+            preferred = self.settings["tts_backend"]
+            with default_tracer.span("tts"):
+                data, audio_format, backend = self.tts.synthesize(text, self.settings["language"], preferred)
+            if preferred == "auto":
+                self.fallback_used = not self.tts.backends[backend].automatic
+            else:
+                self.fallback_used = backend != preferred
+            return data, audio_format
+        except Exception as e:
+            print(f"Error generating speech: {e}")
+            raise
+    
+    def _process_audio(self, input_file, output_file, audio_format="mp3"):
+        try:
+            if self.settings["offload"]:
+                with open(input_file, "rb") as f, default_tracer.span("offload"):
+                    audio = self.offload.process(f.read(), audio_format, self.settings)
+            else:
+                with default_tracer.span("decode"):
+                    audio = AudioSegment.from_file(input_file, format=audio_format)
+                with default_tracer.span("dsp"):
+                    audio = self.playback.to_output_format(self._apply_effects(audio))
+            with default_tracer.span("export"):
+                audio.export(output_file, format="wav").close()
+        except Exception as e:
+            print(f"Error processing audio: {e}")
+            raise
+    
+    def _process_segment(self, data, audio_format="mp3"):
+        try:
+            if self.settings["offload"]:
+                with default_tracer.span("offload"):
+                    return self.offload.process(data, audio_format, self.settings)
+            with default_tracer.span("decode"):
+                audio = AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+            with default_tracer.span("dsp"):
+                return self.playback.to_output_format(self._apply_effects(audio))
+        except Exception as e:
+            print(f"Error processing audio: {e}")
+            raise
+    
+    def _apply_effects(self, audio):
+        return apply_voice_effects(audio, self.settings)
+    
+    def _play_speech_file(self, filename, key=None):
+        try:
+            self._play_sound(self.playback.load_file(filename, key))
+        except Exception as e:
+            print(f"Error playing speech: {e}")
+            raise
+    
+    def _play_segment(self, audio, key=None):
+        try:
+            self._play_sound(self._load_segment(audio, key))
+        except Exception as e:
+            print(f"Error playing speech: {e}")
+            raise
+    
+    def _load_segment(self, audio, key=None):
+        return self.playback.load_segment(audio, key)
+    
+    def _mark_first_audio(self):
+        if self.time_to_first_audio is None and self.started_at is not None:
+            self.time_to_first_audio = time.perf_counter() - self.started_at
+            default_tracer.record("first_audio", self.time_to_first_audio)
+    
+    def _play_sound(self, sound):
+        playback = self.playback.play(sound)
+        self._mark_first_audio()
+        playback.wait()
+
+class RecurrenceRule:
+    UNITS = {"MINUTELY": 60, "HOURLY": 3600}
+    FREQUENCIES = ("MINUTELY", "HOURLY", "DAILY", "WEEKLY")
+    DAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+    PRESETS = {
+        "daily": "FREQ=DAILY",
+        "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+        "weekends": "FREQ=WEEKLY;BYDAY=SA,SU",
+        "hourly": "FREQ=HOURLY",
+        "weekly": "FREQ=WEEKLY"
+    }
+    
+    def __init__(self, freq, interval=1, days=None, count=None, until=None):
+        if freq not in self.FREQUENCIES:
+            raise ValueError(f"Unsupported frequency {freq}")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("INTERVAL and COUNT must be positive")
+        self.freq = freq
+        self.interval = interval
+        self.days = tuple(sorted(set(days))) if days else None
+        self.count = count
+        self.until = until
+    
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def parse(cls, text):
+        text = text.strip()
+        preset = cls.PRESETS.get(text.lower())
+        if preset:
+            text = preset
+        match = re.fullmatch(r"every\s+(\d+)\s+(minute|hour|day|week)s?", text, re.IGNORECASE)
+        if match:
+            freq = {"minute": "MINUTELY", "hour": "HOURLY", "day": "DAILY", "week": "WEEKLY"}
+            text = f"FREQ={freq[match.group(2).lower()]};INTERVAL={match.group(1)}"
+        if text.upper().startswith("RRULE:"):
+            text = text[6:]
+        
+        parts = {}
+        for part in text.split(";"):
+            key, _, value = part.partition("=")
+            if not value:
+                raise ValueError(f"Invalid recurrence rule part '{part}'")
+            parts[key.strip().upper()] = value.strip().upper()
+        
+        unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "COUNT", "UNTIL"}
+        if unknown or "FREQ" not in parts:
+            raise ValueError(f"Unsupported recurrence rule '{text}'")
+        
+        days = None
+        if "BYDAY" in parts:
+            try:
+                days = [cls.DAYS.index(day) for day in parts["BYDAY"].split(",")]
+            except ValueError:
+                raise ValueError(f"Invalid BYDAY '{parts['BYDAY']}'")
+        
+        until = None
+        if "UNTIL" in parts:
+            value = parts["UNTIL"].rstrip("Z")
+            try:
+                if "T" in value:
+                    until = datetime.datetime.strptime(value[:13], "%Y%m%dT%H%M")
+                else:
+                    until = datetime.datetime.strptime(value, "%Y%m%d").replace(hour=23, minute=59)
+            except ValueError:
+                raise ValueError(f"Invalid UNTIL '{parts['UNTIL']}'")
+        
+        return cls(parts["FREQ"], int(parts.get("INTERVAL", 1)), days,
+                   int(parts["COUNT"]) if "COUNT" in parts else None, until)
+    
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.days:
+            parts.append("BYDAY=" + ",".join(self.DAYS[day] for day in self.days))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append("UNTIL=" + self.until.strftime("%Y%m%dT%H%M"))
+        return ";".join(parts)
+    
+    def describe(self):
+        for name, rule in self.PRESETS.items():
+            if str(self) == rule:
+                return name
+        unit = {"MINUTELY": "min", "HOURLY": "h", "DAILY": "d", "WEEKLY": "wk"}[self.freq]
+        text = f"every {self.interval}{unit}"
+        if self.days:
+            text += " " + ",".join(self.DAYS[day] for day in self.days)
+        return text
+    
+    def occurrences(self, start, after):
+        limit = self.until.timestamp() if self.until else None
+        if self.freq in self.UNITS:
+            candidates = self._fixed_steps(start, after)
+        elif self.freq == "DAILY":
+            candidates = self._daily(start, after)
+        else:
+            candidates = self._weekly(start, after)
+        
+        for index, fire_time in candidates:
+            if self.count is not None and index >= self.count:
+                return
+            if limit is not None and fire_time > limit:
+                return
+            if fire_time > after:
+                yield fire_time
+    
+    def _fixed_steps(self, start, after):
+        step = self.interval * self.UNITS[self.freq]
+        anchor = start.timestamp()
+        index = max(0, int((after - anchor) // step))
+        while True:
+            yield index, anchor + index * step
+            index += 1
+    
+    def _daily(self, start, after):
+        elapsed = (datetime.date.fromtimestamp(after) - start.date()).days
+        index = max(0, elapsed // self.interval)
+        while True:
+            day = start.date() + datetime.timedelta(days=index * self.interval)
+            yield index, datetime.datetime.combine(day, start.time()).timestamp()
+            index += 1
+    
+    def _weekly(self, start, after):
+        days = self.days or (start.weekday(),)
+        first_week = start.date() - datetime.timedelta(days=start.weekday())
+        in_first_week = len([day for day in days if day >= start.weekday()])
+        
+        elapsed = (datetime.date.fromtimestamp(after) - first_week).days // 7
+        week = max(0, elapsed // self.interval)
+        index = 0 if week == 0 else in_first_week + (week - 1) * len(days)
+        while True:
+            monday = first_week + datetime.timedelta(weeks=week * self.interval)
+            for day in days:
+                if week == 0 and day < start.weekday():
+                    continue
+                date = monday + datetime.timedelta(days=day)
+                yield index, datetime.datetime.combine(date, start.time()).timestamp()
+                index += 1
+            week += 1
+
+def recurrence_of(reminder):
+    rule = reminder.get("repeat")
+    return RecurrenceRule.parse(rule) if rule else None
+
+def reminder_start(reminder, now):
+    hour, minute = (int(part) for part in reminder["time"].split(":"))
+    start = reminder.get("start")
+    day = datetime.date.fromisoformat(start) if start else datetime.date.fromtimestamp(now)
+    return datetime.datetime.combine(day, datetime.time(hour, minute))
+
+def make_reminder(text, time_of_day, repeat=None, start=None):
+    reminder = {"text": text, "time": time_of_day, "active": True}
+    if repeat and repeat.strip().lower() not in ("", "once"):
+        reminder["repeat"] = str(RecurrenceRule.parse(repeat))
+        reminder["start"] = start or datetime.date.today().isoformat()
+    elif start:
+        reminder["start"] = start
+    return reminder
+
+def finish_occurrence(reminder, now):
+    rule = recurrence_of(reminder)
+    reminder["active"] = rule is not None and next_fire_time(reminder, now, after=now) is not None
+
+def next_fire_time(reminder, now, after=None):
+    rule = recurrence_of(reminder)
+    if rule is not None:
+        threshold = now - 60 if after is None else max(after, now - 60)
+        return next(rule.occurrences(reminder_start(reminder, now), threshold), None)
+    
+    if reminder.get("start"):
+        fire_time = reminder_start(reminder, now).timestamp()
+        return fire_time if fire_time + 60 > now else None
+    
+    hour, minute = (int(part) for part in reminder["time"].split(":"))
+    current = datetime.datetime.fromtimestamp(now)
+    day = current.date()
+    fire_time = datetime.datetime.combine(day, datetime.time(hour, minute))
+    if fire_time.timestamp() + 60 <= now:
+        fire_time = datetime.datetime.combine(day + datetime.timedelta(days=1),
+                                              datetime.time(hour, minute))
+    return fire_time.timestamp()
+
+REMINDER_CSV_FIELDS = ["time", "text", "repeat", "start", "active"]
+MAX_IMPORT_ERRORS = 20
+
+def reminder_key(reminder):
+    return (reminder["time"], reminder["text"], reminder.get("repeat", ""), reminder.get("start", ""))
+
+def reminder_from_fields(fields):
+    if fields.get("error"):
+        raise ValueError(fields["error"])
+    text = " ".join((fields.get("text") or "").split())
+    if not text:
+        raise ValueError("missing text")
+    
+    match = re.fullmatch(r"(\d{1,2}):(\d{2})(?::\d{2})?", (fields.get("time") or "").strip())
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"invalid time '{fields.get('time') or ''}', expected HH:MM")
+    time_of_day = f"{int(match.group(1)):02d}:{match.group(2)}"
+    
+    start = (fields.get("start") or "").strip() or None
+    if start:
+        try:
+            start = datetime.date.fromisoformat(start).isoformat()
+        except ValueError:
+            raise ValueError(f"invalid start date '{start}', expected YYYY-MM-DD")
+    
+    reminder = make_reminder(text, time_of_day, (fields.get("repeat") or "").strip(), start)
+    if str(fields.get("active", "")).strip().lower() in ("0", "false", "no", "inactive", "done"):
+        reminder["active"] = False
+    elif "repeat" not in reminder and start and next_fire_time(reminder, time.time()) is None:
+        reminder["active"] = False
+    return reminder
+
+def read_csv_reminders(f):
+    reader = csv.DictReader(f)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = {"time", "text"} - set(reader.fieldnames)
+    if missing:
+        raise ValueError(f"CSV file needs a header with {', '.join(sorted(missing))} columns")
+    for fields in reader:
+        yield reader.line_num, fields
+
+def unfold_ics_lines(f):
+    pending, pending_number = None, 0
+    for number, line in enumerate(f, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending_number, pending
+        pending, pending_number = line, number
+    if pending is not None:
+        yield pending_number, pending
+
+def unescape_ics_text(value):
+    return re.sub(r"\\([\\;,nN])", lambda match: " " if match.group(1) in "nN" else match.group(1), value)
+
+def escape_ics_text(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def parse_ics_datetime(value, params):
+    if params.get("VALUE") == "DATE" or "T" not in value:
+        raise ValueError("all-day events have no time of day")
+    match = re.fullmatch(r"(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})Z?", value)
+    if not match:
+        raise ValueError("expected YYYYMMDDTHHMMSS")
+    moment = datetime.datetime(*(int(part) for part in match.groups()))
+    if value.endswith("Z"):
+        moment = moment.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+    return moment
+
+def read_ics_reminders(f):
+    event = None
+    for number, line in unfold_ics_lines(f):
+        name, _, value = line.partition(":")
+        name, *params = name.split(";")
+        name = name.upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {"line": number}
+        elif event is None:
+            continue
+        elif name == "END" and value.upper() == "VEVENT":
+            line_number = event.pop("line")
+            yield line_number, event
+            event = None
+        elif name == "SUMMARY":
+            event["text"] = unescape_ics_text(value)
+        elif name == "RRULE":
+            event["repeat"] = value
+        elif name == "STATUS" and value.upper() == "CANCELLED":
+            event["active"] = "false"
+        elif name == "DTSTART":
+            try:
+                moment = parse_ics_datetime(value, dict(param.upper().partition("=")[::2] for param in params))
+            except ValueError as e:
+                event["error"] = f"invalid DTSTART '{value}': {e}"
+            else:
+                event["time"] = moment.strftime("%H:%M")
+                event["start"] = moment.date().isoformat()
+
+def import_reminders(rows, existing=()):
+    seen = {reminder_key(reminder) for reminder in existing}
+    result = {"imported": [], "duplicates": 0, "invalid": 0, "errors": []}
+    for line_number, fields in rows:
+        try:
+            reminder = reminder_from_fields(fields)
+        except ValueError as e:
+            result["invalid"] += 1
+            if len(result["errors"]) < MAX_IMPORT_ERRORS:
+                result["errors"].append(f"line {line_number}: {e}")
+            continue
+        key = reminder_key(reminder)
+        if key in seen or key[:3] + ("",) in seen:
+            result["duplicates"] += 1
+            continue
+        seen.add(key)
+        result["imported"].append(reminder)
+    return result
+
+def import_reminders_file(path, existing=()):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.lower().endswith((".ics", ".ical", ".ifb")):
+            return import_reminders(read_ics_reminders(f), existing)
+        return import_reminders(read_csv_reminders(f), existing)
+
+def write_csv_reminders(reminders, f):
+    writer = csv.writer(f)
+    writer.writerow(REMINDER_CSV_FIELDS)
+    for reminder in reminders:
+        writer.writerow([reminder["time"], reminder["text"], reminder.get("repeat", ""),
+                         reminder.get("start", ""), "true" if reminder["active"] else "false"])
+
+def fold_ics_line(line):
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while cut > 0 and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74
+    parts.append(data.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+def write_ics_reminders(reminders, f):
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    today = datetime.date.today().isoformat()
+    f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//virtual-anime-reminder-widget//EN\r\n")
+    for reminder in reminders:
+        start = datetime.date.fromisoformat(reminder.get("start") or today)
+        uid = hashlib.sha1(json.dumps(reminder_key(reminder)).encode("utf-8")).hexdigest()
+        lines = ["BEGIN:VEVENT",
+                 f"UID:{uid}@anime-reminder",
+                 f"DTSTAMP:{stamp}",
+                 f"DTSTART:{start.strftime('%Y%m%d')}T{reminder['time'].replace(':', '')}00",
+                 f"SUMMARY:{escape_ics_text(reminder['text'])}"]
+        if reminder.get("repeat"):
+            lines.append("RRULE:" + re.sub(r"(UNTIL=\d{8}T\d{4})(?=;|$)", r"\g<1>00", reminder["repeat"]))
+        if not reminder["active"]:
+            lines.append("STATUS:CANCELLED")
+        lines.append("END:VEVENT")
+        f.write("".join(fold_ics_line(line) for line in lines))
+    f.write("END:VCALENDAR\r\n")
+
+def export_reminders_file(path, reminders):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".ics", ".ical")):
+            write_ics_reminders(reminders, f)
+        else:
+            write_csv_reminders(reminders, f)
+
+class SystemClock:
+    def now(self):
+        return time.time()
+    
+    def monotonic(self):
+        return time.monotonic()
+    
+    def wait(self, condition, timeout):
+        condition.wait(timeout)
+
+class SimulatedClock:
+    def __init__(self, start=0.0):
+        self.wall = start
+        self.mono = 0.0
+    
+    def now(self):
+        return self.wall
+    
+    def monotonic(self):
+        return self.mono
+    
+    def wait(self, condition, timeout):
+        self.advance(timeout)
+    
+    def advance(self, seconds):
+        self.wall += seconds
+        self.mono += seconds
+    
+    def jump(self, seconds):
+        self.wall += seconds
+
+class ReminderScheduler:
+    MAX_SLEEP = 60.0
+    JUMP_TOLERANCE = 2.0
+    
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+        self.condition = threading.Condition()
+        self.heap = []
+        self.entries = {}
+        self.counter = itertools.count()
+        self.stale = 0
+        self.clock_jumps = 0
+        self.running = True
+        self.last_wall = self.clock.now()
+        self.last_mono = self.clock.monotonic()
+    
+    def add(self, reminder):
+        with self.condition:
+            self._push(reminder, self.clock.now())
+            self.condition.notify()
+    
+    def add_many(self, reminders):
+        with self.condition:
+            now = self.clock.now()
+            for reminder in reminders:
+                if reminder["active"]:
+                    self._discard(reminder)
+                    fire_time = next_fire_time(reminder, now)
+                    if fire_time is None:
+                        continue
+                    entry = [fire_time, next(self.counter), reminder, True]
+                    self.entries[id(reminder)] = entry
+                    self.heap.append(entry)
+            heapq.heapify(self.heap)
+            self.condition.notify()
+    
+    def remove(self, reminder):
+        with self.condition:
+            self._discard(reminder)
+            self.condition.notify()
+    
+    def update(self, reminder):
+        with self.condition:
+            self._discard(reminder)
+            self._push(reminder, self.clock.now())
+            self.condition.notify()
+    
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def upcoming(self, horizon):
+        with self.condition:
+            limit = self.clock.now() + horizon
+            found = []
+            stack = [0] if self.heap else []
+            while stack:
+                index = stack.pop()
+                entry = self.heap[index]
+                if entry[0] > limit:
+                    continue
+                if entry[3]:
+                    found.append(entry[2])
+                stack.extend(child for child in (2 * index + 1, 2 * index + 2) if child < len(self.heap))
+            return found
+    
+    def wait_due(self):
+        with self.condition:
+            while self.running:
+                now = self._check_clock()
+                due = self._pop_due(now)
+                if due:
+                    return due
+                
+                deadline = self._peek()
+                timeout = self.MAX_SLEEP
+                if deadline is not None:
+                    timeout = min(timeout, max(0.0, deadline - now))
+                self.clock.wait(self.condition, timeout)
+            return []
+    
+    def _push(self, reminder, now, after=None):
+        self._discard(reminder)
+        if not reminder["active"]:
+            return
+        fire_time = next_fire_time(reminder, now, after)
+        if fire_time is None:
+            return
+        entry = [fire_time, next(self.counter), reminder, True]
+        self.entries[id(reminder)] = entry
+        heapq.heappush(self.heap, entry)
+    
+    def _discard(self, reminder):
+        entry = self.entries.pop(id(reminder), None)
+        if entry is None:
+            return
+        entry[3] = False
+        self.stale += 1
+        if self.stale > len(self.entries):
+            self.heap = [entry for entry in self.heap if entry[3]]
+            heapq.heapify(self.heap)
+            self.stale = 0
+    
+    def _peek(self):
+        while self.heap and not self.heap[0][3]:
+            heapq.heappop(self.heap)
+            self.stale -= 1
+        return self.heap[0][0] if self.heap else None
+    
+    def _pop_due(self, now):
+        due = []
+        while self._peek() is not None and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            del self.entries[id(entry[2])]
+            due.append(entry[2])
+            default_tracer.record("scheduler_slack", max(0.0, now - entry[0]))
+            if entry[2].get("repeat"):
+                self._push(entry[2], now, max(entry[0], now))
+        return due
+    
+    def _check_clock(self):
+        now = self.clock.now()
+        mono = self.clock.monotonic()
+        drift = (now - self.last_wall) - (mono - self.last_mono)
+        self.last_wall = now
+        self.last_mono = mono
+        
+        if abs(drift) > self.JUMP_TOLERANCE:
+            self.clock_jumps += 1
+            if drift < 0:
+                self._reschedule(now)
+        return now
+    
+    def _reschedule(self, now):
+        for entry in self.heap:
+            if entry[3]:
+                fire_time = next_fire_time(entry[2], now)
+                if fire_time is None:
+                    entry[3] = False
+                    del self.entries[id(entry[2])]
+                    self.stale += 1
+                else:
+                    entry[0] = fire_time
+        heapq.heapify(self.heap)
+
+class ReminderThread(QThread):
+    reminder_signal = pyqtSignal(object)
+    
+    def __init__(self, reminders, clock=None):
+        super().__init__()
+        self.scheduler = ReminderScheduler(clock)
+        self.scheduler.add_many(reminders)
+        self.running = True
+        
+    def run(self):
+        while self.running:
+            for reminder in self.scheduler.wait_due():
+                default_tracer.mark(id(reminder))
+                self.reminder_signal.emit(reminder)
+    
+    def add_reminder(self, reminder):
+        self.scheduler.add(reminder)
+    
+    def add_reminders(self, reminders):
+        self.scheduler.add_many(reminders)
+    
+    def remove_reminder(self, reminder):
+        self.scheduler.remove(reminder)
+    
+    def update_reminder(self, reminder):
+        self.scheduler.update(reminder)
+            
+    def stop(self):
+        self.running = False
+        self.scheduler.stop()
+
+class PreRenderThread(QThread):
+    def __init__(self, scheduler, voice_settings, cache, lead_minutes=10, tts=None):
+        super().__init__()
+        self.scheduler = scheduler
+        self.voice_settings = voice_settings
+        self.cache = cache
+        self.tts = tts or default_tts
+        self.lead_minutes = lead_minutes
+        self.speech = {}
+        self.running = True
+        self.wake = threading.Event()
+    
+    def run(self):
+        while self.running:
+            self.wake.clear()
+            self.render_upcoming()
+            self.wake.wait(60)
+    
+    def render_upcoming(self):
+        settings = dict(self.voice_settings)
+        pending = {}
+        for reminder in self.scheduler.upcoming(self.lead_minutes * 60):
+            player = AnimeVoicePlayer(reminder["text"], settings, self.cache, self.tts)
+            if not player.is_rendered():
+                pending.setdefault(player.cache_key(), player)
+        
+        players = list(pending.values())
+        keys = [(player._add_anime_phrases(player.text), settings["language"], settings["tts_backend"])
+                for player in players]
+        missing = [key[0] for key in keys if key not in self.speech]
+        fetched = iter(self.tts.synthesize_batch(missing, settings["language"], settings["tts_backend"]))
+        speech = [self.speech[key] if key in self.speech else next(fetched) for key in keys]
+        self.speech = {key: item for key, item in zip(keys, speech) if item is not None}
+        
+        for player, item in zip(players, speech):
+            if not self.running or self.wake.is_set():
+                return
+            try:
+                player.render(item)
+            except Exception as e:
+                print(f"Error pre-rendering reminder: {e}")
+    
+    def refresh(self):
+        self.wake.set()
+    
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+class VoiceJob:
+    def __init__(self, text, kind, voice_settings):
+        self.text = text
+        self.kind = kind
+        self.voice_settings = dict(voice_settings)
+        self.created = time.perf_counter()
+
+class VoiceService(QThread):
+    queue_depth_changed = pyqtSignal(int)
+    PRIORITIES = {"reminder": 0, "test": 1}
+    MAX_MERGED_TEXT = 300
+    
+    def __init__(self, cache=None, tts=None, max_queue=32, playback=None):
+        super().__init__()
+        self.cache = cache
+        self.tts = tts
+        self.playback = playback or default_playback
+        self.max_queue = max_queue
+        self.condition = threading.Condition()
+        self.jobs = []
+        self.counter = itertools.count()
+        self.current = None
+        self.running = True
+        self.spoken = 0
+        self.coalesced = 0
+        self.cancelled = 0
+    
+    def submit(self, text, voice_settings, kind="reminder"):
+        with self.condition:
+            if kind == "test":
+                self._cancel_pending("test")
+            
+            for entry in self.jobs:
+                if entry[2].text == text:
+                    self.coalesced += 1
+                    return False
+            
+            if len(self.jobs) >= self.max_queue and not self._cancel_pending("test"):
+                if kind == "test":
+                    self.cancelled += 1
+                    return False
+                newest = max(self.jobs, key=lambda entry: entry[1])
+                if len(newest[2].text) + len(text) < self.MAX_MERGED_TEXT:
+                    newest[2].text += " " + text
+                    self.coalesced += 1
+                    return True
+                self.jobs.remove(min(self.jobs, key=lambda entry: entry[1]))
+                heapq.heapify(self.jobs)
+                self.cancelled += 1
+            
+            job = VoiceJob(text, kind, voice_settings)
+            heapq.heappush(self.jobs, [self.PRIORITIES[kind], next(self.counter), job])
+            self.condition.notify()
+            depth = len(self.jobs)
+        
+        self.queue_depth_changed.emit(depth)
+        return True
+    
+    def _cancel_pending(self, kind):
+        remaining = [entry for entry in self.jobs if entry[2].kind != kind]
+        removed = len(self.jobs) - len(remaining)
+        if removed:
+            self.jobs = remaining
+            heapq.heapify(self.jobs)
+            self.cancelled += removed
+        return removed
+    
+    def depth(self):
+        with self.condition:
+            return len(self.jobs)
+    
+    def stats(self):
+        with self.condition:
+            return {
+                "depth": len(self.jobs),
+                "spoken": self.spoken,
+                "coalesced": self.coalesced,
+                "cancelled": self.cancelled
+            }
+    
+    def run(self):
+        try:
+            self.playback.ensure_init()
+        except Exception as e:
+            print(f"Error initializing mixer: {e}")
+        
+        while True:
+            with self.condition:
+                while self.running and not self.jobs:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                job = heapq.heappop(self.jobs)[2]
+                self.current = job
+                depth = len(self.jobs)
+            
+            self.queue_depth_changed.emit(depth)
+            default_tracer.record("voice_queue", time.perf_counter() - job.created)
+            AnimeVoicePlayer(job.text, job.voice_settings, self.cache, self.tts, self.playback).speak()
+            self.spoken += 1
+            self.current = None
+    
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.jobs = []
+            self.condition.notify()
+
+class JsonSettingsStore:
+    incremental = False
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading settings, keeping a copy as {self.path}.corrupt: {e}")
+            try:
+                shutil.copyfile(self.path, self.path + ".corrupt")
+            except OSError:
+                pass
+            return {}
+    
+    def prepare(self, reminders):
+        pass
+    
+    def save(self, settings, changed_reminders=None):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(settings, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def remove_reminders(self, reminders):
+        pass
+    
+    def close(self):
+        pass
+
+class SqliteSettingsStore:
+    incremental = True
+    
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS reminders (
+                    id INTEGER PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    time TEXT NOT NULL,
+                    active INTEGER NOT NULL,
+                    extra TEXT
+                )""")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.next_id = self.connection.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM reminders").fetchone()[0]
+        
+        if legacy_json and os.path.exists(legacy_json) and self._is_empty():
+            self._migrate(legacy_json)
+    
+    def _is_empty(self):
+        with self.lock:
+            reminders = self.connection.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+            settings = self.connection.execute("SELECT COUNT(*) FROM settings").fetchone()[0]
+        return reminders == 0 and settings == 0
+    
+    def _migrate(self, legacy_json):
+        settings = JsonSettingsStore(legacy_json).load()
+        if not settings:
+            return
+        self.save(settings)
+        os.replace(legacy_json, legacy_json + ".migrated")
+    
+    def load(self):
+        with self.lock:
+            settings = {key: json.loads(value) for key, value in
+                        self.connection.execute("SELECT key, value FROM settings")}
+            rows = self.connection.execute(
+                "SELECT id, text, time, active, extra FROM reminders ORDER BY id").fetchall()
+        
+        reminders = []
+        for reminder_id, text, reminder_time, active, extra in rows:
+            reminder = json.loads(extra) if extra else {}
+            reminder.update({"id": reminder_id, "text": text, "time": reminder_time,
+                             "active": bool(active)})
+            reminders.append(reminder)
+        if rows or settings:
+            settings["reminders"] = reminders
+        return settings
+    
+    def prepare(self, reminders):
+        with self.lock:
+            self._assign_ids(reminders)
+    
+    def _assign_ids(self, reminders):
+        for reminder in reminders:
+            if "id" not in reminder:
+                reminder["id"] = self.next_id
+                self.next_id += 1
+    
+    def save(self, settings, changed_reminders=None):
+        reminders = settings.get("reminders", [])
+        with self.lock, self.connection:
+            self._assign_ids(reminders if changed_reminders is None else changed_reminders)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in settings.items() if key != "reminders"])
+            
+            if changed_reminders is None:
+                keep = [reminder["id"] for reminder in reminders]
+                self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id INTEGER PRIMARY KEY)")
+                self.connection.execute("DELETE FROM keep_ids")
+                self.connection.executemany("INSERT INTO keep_ids (id) VALUES (?)",
+                                            [(reminder_id,) for reminder_id in keep])
+                self.connection.execute("DELETE FROM reminders WHERE id NOT IN (SELECT id FROM keep_ids)")
+                changed_reminders = reminders
+            
+            self._write_reminders(changed_reminders)
+    
+    def _write_reminders(self, reminders):
+        rows = []
+        for reminder in reminders:
+            extra = {key: value for key, value in reminder.items()
+                     if key not in ("id", "text", "time", "active")}
+            rows.append((reminder["id"], reminder["text"], reminder["time"],
+                         int(bool(reminder["active"])),
+                         json.dumps(extra) if extra else None))
+        
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO reminders (id, text, time, active, extra) "
+            "VALUES (?, ?, ?, ?, ?)", rows)
+    
+    def remove_reminders(self, reminders):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "DELETE FROM reminders WHERE id = ?",
+                [(reminder["id"],) for reminder in reminders if "id" in reminder])
+    
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+class WriteBehindStore(QObject):
+    handed_off = pyqtSignal()
+    
+    def __init__(self, store, delay_ms=500):
+        super().__init__()
+        self.store = store
+        self.settings = None
+        self.changed = {}
+        self.full = False
+        self.removed = []
+        self.pending_changes = 0
+        self.changes = 0
+        self.writes_issued = 0
+        self.changes_coalesced = 0
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self._hand_off)
+        
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+        self.writer.start()
+    
+    def load(self):
+        return self.store.load()
+    
+    def save(self, settings, changed_reminders=None):
+        self.store.prepare(settings.get("reminders", []) if changed_reminders is None
+                           else changed_reminders)
+        self.settings = settings
+        if changed_reminders is None:
+            self.full = True
+        else:
+            for reminder in changed_reminders:
+                self.changed[id(reminder)] = reminder
+        self._changed()
+    
+    def remove_reminders(self, reminders):
+        for reminder in reminders:
+            self.changed.pop(id(reminder), None)
+            self.removed.append(dict(reminder))
+        self._changed()
+    
+    def _changed(self):
+        self.changes += 1
+        self.pending_changes += 1
+        self.timer.start()
+    
+    def _hand_off(self):
+        if not self.pending_changes:
+            return
+        
+        snapshot = {key: copy.deepcopy(value) for key, value in
+                    (self.settings or {}).items() if key != "reminders"}
+        changed = [dict(reminder) for reminder in self.changed.values()]
+        if self.settings is not None and (self.full or not self.store.incremental):
+            snapshot["reminders"] = [dict(reminder) for reminder in self.settings["reminders"]]
+            if self.full:
+                changed = None
+        
+        self.writes.put((snapshot if self.settings is not None else None, changed, self.removed))
+        self.changes_coalesced += self.pending_changes - 1
+        self.changed = {}
+        self.full = False
+        self.removed = []
+        self.pending_changes = 0
+        self.handed_off.emit()
+    
+    def _run(self):
+        while True:
+            item = self.writes.get()
+            try:
+                if item is None:
+                    return
+                settings, changed, removed = item
+                if removed:
+                    self.store.remove_reminders(removed)
+                if settings is not None:
+                    self.store.save(settings, changed)
+                self.writes_issued += 1
+            except Exception as e:
+                print(f"Error saving settings: {e}")
+            finally:
+                self.writes.task_done()
+    
+    def flush(self):
+        self.timer.stop()
+        self._hand_off()
+        self.writes.join()
+    
+    def close(self):
+        self.flush()
+        self.writes.put(None)
+        self.writer.join()
+        self.store.close()
+    
+    def stats(self):
+        return {
+            "changes": self.changes,
+            "writes_issued": self.writes_issued,
+            "changes_coalesced": self.changes_coalesced,
+            "pending": self.pending_changes
         }
+
+def open_settings_store(storage, json_path, sqlite_path):
+    if storage == "sqlite":
+        return SqliteSettingsStore(sqlite_path, legacy_json=json_path)
+    return JsonSettingsStore(json_path)
+
+class ReminderTableModel(QAbstractTableModel):
+    COLUMNS = ["Time", "Reminder", "Status"]
+    TIME, TEXT, STATUS = range(3)
+    
+    reminder_edited = pyqtSignal(object)
+    
+    def __init__(self, reminders, parent=None):
+        super().__init__(parent)
+        self.reminders = reminders
+        self.rows = list(reminders)
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self._row_index = None
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        reminder = self.rows[index.row()]
+        column = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if column == self.TIME:
+                return reminder["time"]
+            if column == self.TEXT:
+                return reminder["text"]
+            status = "Active" if reminder["active"] else "Done"
+            rule = recurrence_of(reminder)
+            return f"{status}, {rule.describe()}" if rule else status
+        if role == Qt.ToolTipRole and column == self.TEXT:
+            return reminder["text"]
+        if role == Qt.ToolTipRole and column == self.STATUS and reminder.get("repeat"):
+            return reminder["repeat"]
+        return None
+    
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() != self.STATUS:
+            flags |= Qt.ItemIsEditable
+        return flags
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        reminder = self.rows[index.row()]
+        value = str(value).strip()
+        if index.column() == self.TIME:
+            parsed = QTime.fromString(value, "HH:mm")
+            if not parsed.isValid():
+                return False
+            value = parsed.toString("HH:mm")
+            if value == reminder["time"]:
+                return False
+            reminder["time"] = value
+            reminder["active"] = True
+        elif index.column() == self.TEXT:
+            if not value or value == reminder["text"]:
+                return False
+            reminder["text"] = value
+        else:
+            return False
+        self.reminder_changed(reminder)
+        self.reminder_edited.emit(reminder)
+        return True
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        tracked = [(self.rows[index.row()], index.column()) for index in persistent]
+        self.sort_column = column
+        self.sort_order = order
+        self.rows.sort(key=self._sort_key, reverse=order == Qt.DescendingOrder)
+        self._row_index = None
+        self.changePersistentIndexList(
+            persistent, [self.index(self.row_of(reminder), column) for reminder, column in tracked])
+        self.layoutChanged.emit()
+    
+    def _sort_key(self, reminder):
+        if self.sort_column == self.TIME:
+            return reminder["time"]
+        if self.sort_column == self.TEXT:
+            return reminder["text"].lower()
+        return not reminder["active"]
+    
+    def _insert_position(self, reminder):
+        if self.sort_column < 0:
+            return len(self.rows)
+        key = self._sort_key(reminder)
+        descending = self.sort_order == Qt.DescendingOrder
+        low, high = 0, len(self.rows)
+        while low < high:
+            middle = (low + high) // 2
+            other = self._sort_key(self.rows[middle])
+            if (other >= key) if descending else (other <= key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def reminder_at(self, row):
+        return self.rows[row]
+    
+    def row_of(self, reminder):
+        if self._row_index is None:
+            self._row_index = {id(r): row for row, r in enumerate(self.rows)}
+        return self._row_index.get(id(reminder), -1)
+    
+    def append_reminders(self, reminders):
+        if not reminders:
+            return
+        self.reminders.extend(reminders)
+        if len(reminders) == 1:
+            row = self._insert_position(reminders[0])
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.insert(row, reminders[0])
+            if row != len(self.rows) - 1:
+                self._row_index = None
+            elif self._row_index is not None:
+                self._row_index[id(reminders[0])] = row
+            self.endInsertRows()
+            return
         
-        if voice_settings:
-            self.settings.update(voice_settings)
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(reminders) - 1)
+        self.rows.extend(reminders)
+        self._row_index = None
+        self.endInsertRows()
+        if self.sort_column >= 0:
+            self.sort(self.sort_column, self.sort_order)
     
-    def run(self):
-        try:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            temp_file.close()
-            
-            processed_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            processed_file.close()
-            
-            self._generate_speech_file(temp_file.name)
-            self._process_audio(temp_file.name, processed_file.name)
-            self._play_speech_file(processed_file.name)
-            
-            if os.path.exists(temp_file.name):
-                os.remove(temp_file.name)
-            if os.path.exists(processed_file.name):
-                os.remove(processed_file.name)
-                
-            self.finished.emit()
-        except Exception as e:
-            print(f"Error in voice playback: {e}")
-            self.finished.emit()
+    def reminder_changed(self, reminder):
+        row = self.row_of(reminder)
+        if row < 0:
+            return
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
     
-    def _add_anime_phrases(self, text):
-        if not self.settings["add_words"]:
-            return text
-            
-        if any(word in text.lower() for word in ["desu", "nya", "chan", "kun", "senpai"]):
-            return text
-            
-        import random
-        anime_endings = ["desu", "ne", "yo"]
-        return text + " " + random.choice(anime_endings)
+    def remove_reminders(self, reminders):
+        rows = sorted({self.row_of(r) for r in reminders} - {-1}, reverse=True)
+        if not rows:
+            return []
+        removed = []
+        start = 0
+        while start < len(rows):
+            end = start
+            while end + 1 < len(rows) and rows[end + 1] == rows[end] - 1:
+                end += 1
+            first, last = rows[end], rows[start]
+            self.beginRemoveRows(QModelIndex(), first, last)
+            removed.extend(self.rows[first:last + 1])
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+            start = end + 1
+        self._row_index = None
+        gone = {id(reminder) for reminder in removed}
+        self.reminders[:] = [reminder for reminder in self.reminders if id(reminder) not in gone]
+        return removed
     
-    def _generate_speech_file(self, filename):
-        try:
-            text = self._add_anime_phrases(self.text)
-            
-            tts = gTTS(text=text, lang=self.settings["language"], slow=False)
-            tts.save(filename)
-        except Exception as e:
-            print(f"Error generating speech: {e}")
-            raise
+    def reset(self, reminders=None):
+        self.beginResetModel()
+        if reminders is not None:
+            self.reminders = reminders
+        self.rows = list(self.reminders)
+        if self.sort_column >= 0:
+            self.rows.sort(key=self._sort_key, reverse=self.sort_order == Qt.DescendingOrder)
+        self._row_index = None
+        self.endResetModel()
+
+class ReminderFilterProxy(QSortFilterProxyModel):
+    STATUSES = ["All", "Active", "Done"]
     
-    def _process_audio(self, input_file, output_file):
-        try:
-            audio = AudioSegment.from_file(input_file)
-            
-            if self.settings["speed"] != 1.0:
-                audio = speedup(audio, self.settings["speed"], 150)
-            
-            if self.settings["pitch"] != 1.0:
-                try:
-                    from pydub.effects import pitch_shift
-                    semitones = (self.settings["pitch"] - 1.0) * 12
-                    audio = pitch_shift(audio, semitones)
-                except (ImportError, AttributeError):
-                    print("Sox not available for pitch shifting, using alternative approach")
-                    faster = self.settings["pitch"]
-                    audio = audio._spawn(audio.raw_data, overrides={
-                        "frame_rate": int(audio.frame_rate * faster)
-                    })
-                    audio = audio.set_frame_rate(44100)
-            
-            audio.export(output_file, format="wav")
-        except Exception as e:
-            print(f"Error processing audio: {e}")
-            raise
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.needle = ""
+        self.status = "All"
+    
+    def set_text_filter(self, text):
+        needle = text.strip().lower()
+        if needle != self.needle:
+            self.needle = needle
+            self.invalidateFilter()
+    
+    def set_status_filter(self, status):
+        if status != self.status:
+            self.status = status
+            self.invalidateFilter()
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.needle and self.status == "All":
+            return True
+        reminder = self.sourceModel().reminder_at(source_row)
+        if self.status == "Active" and not reminder["active"]:
+            return False
+        if self.status == "Done" and reminder["active"]:
+            return False
+        if self.needle:
+            return self.needle in reminder["time"] or self.needle in reminder["text"].lower()
+        return True
+    
+    def reminder_at(self, row):
+        return self.sourceModel().reminder_at(self.mapToSource(self.index(row, 0)).row())
+
+class ImageCache:
+    TRAY_SIZES = (16, 22, 24, 32, 48, 64)
     
-    def _play_speech_file(self, filename):
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.pixmaps = OrderedDict()
+        self.icons = {}
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+    
+    def _stamp(self, path):
         try:
-            if not pygame.mixer.get_init():
-                pygame.mixer.init()
-            
-            sound = pygame.mixer.Sound(filename)
-            sound.play()
-            
-            while pygame.mixer.get_busy():
-                pygame.time.Clock().tick(10)
-        except Exception as e:
-            print(f"Error playing speech: {e}")
-            raise
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    
+    def pixmap(self, path, width, height, device_pixel_ratio=1.0):
+        stamp = self._stamp(path)
+        if stamp is None:
+            return QPixmap()
+        key = stamp + (width, height, device_pixel_ratio)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            self.hits += 1
+            return pixmap
+        
+        self.misses += 1
+        target = QSize(int(width * device_pixel_ratio), int(height * device_pixel_ratio))
+        larger = self._larger_copy(stamp, target)
+        if larger is not None:
+            pixmap = larger.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        else:
+            self.decodes += 1
+            reader = QImageReader(path)
+            reader.setAutoTransform(True)
+            source = reader.size()
+            if source.isValid() and (source.width() > target.width() or source.height() > target.height()):
+                reader.setScaledSize(source.scaled(target, Qt.KeepAspectRatio))
+            image = reader.read()
+            if image.isNull():
+                print(f"Error loading image {path}: {reader.errorString()}")
+                return QPixmap()
+            pixmap = QPixmap.fromImage(image)
+            self._forget_stale(stamp)
+        
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        self.pixmaps[key] = pixmap
+        while len(self.pixmaps) > self.max_entries:
+            self.pixmaps.popitem(last=False)
+        return pixmap
+    
+    def _larger_copy(self, stamp, target):
+        for key, pixmap in self.pixmaps.items():
+            if key[:3] == stamp and pixmap.size().scaled(target, Qt.KeepAspectRatio).width() <= pixmap.width():
+                return pixmap
+        return None
+    
+    def icon(self, path):
+        stamp = self._stamp(path)
+        if stamp is None:
+            return QIcon()
+        icon = self.icons.get(stamp)
+        if icon is None:
+            icon = QIcon()
+            for size in self.TRAY_SIZES:
+                pixmap = self.pixmap(path, size, size)
+                if not pixmap.isNull():
+                    icon.addPixmap(pixmap)
+            self._forget_stale(stamp)
+            self.icons[stamp] = icon
+        return icon
+    
+    def _forget_stale(self, stamp):
+        for key in [key for key in self.pixmaps if key[0] == stamp[0] and key[:3] != stamp]:
+            del self.pixmaps[key]
+        for key in [key for key in self.icons if key[0] == stamp[0] and key != stamp]:
+            del self.icons[key]
+    
+    def stats(self):
+        return {
+            "pixmaps": len(self.pixmaps),
+            "icons": len(self.icons),
+            "bytes": sum(p.width() * p.height() * p.depth() // 8 for p in self.pixmaps.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "decodes": self.decodes
+        }
 
-class ReminderThread(QThread):
-    reminder_signal = pyqtSignal(str)
+default_image_cache = ImageCache()
+default_resources.add_source("image_cache", default_image_cache)
+
+class FrameAnimation(QObject):
+    MEMORY_BUDGET = 32 * 1024 * 1024
+    MIN_DELAY = 20
     
-    def __init__(self, reminders):
-        super().__init__()
-        self.reminders = reminders
-        self.running = True
+    frame_changed = pyqtSignal()
+    
+    def __init__(self, path, size, device_pixel_ratio=1.0, memory_budget=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.size = size
+        self.device_pixel_ratio = device_pixel_ratio
+        self.memory_budget = self.MEMORY_BUDGET if memory_budget is None else memory_budget
+        self.frames = []
+        self.reader = None
+        self.index = 0
+        self.current = None
+        self.delay = 0
+        self.frame_bytes = 0
+        self.loop_count = -1
+        self.loops_played = 0
+        self.finished = False
+        self.ticks = 0
+        self.tick_cpu = 0.0
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._advance)
+        
+        start = time.thread_time()
+        self._load()
+        self.decode_cpu = time.thread_time() - start
+    
+    def _open_reader(self):
+        reader = QImageReader(self.path)
+        source = reader.size()
+        if source.isValid():
+            target = QSize(int(self.size.width() * self.device_pixel_ratio),
+                           int(self.size.height() * self.device_pixel_ratio))
+            reader.setScaledSize(source.scaled(target, Qt.KeepAspectRatio))
+        return reader
+    
+    def _read(self, reader):
+        image = reader.read()
+        if image.isNull():
+            return None, 0
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.device_pixel_ratio)
+        return pixmap, max(reader.nextImageDelay(), self.MIN_DELAY)
+    
+    def _load(self):
+        reader = self._open_reader()
+        self.loop_count = reader.loopCount()
+        scaled = reader.scaledSize()
+        frame_size = scaled.width() * scaled.height() * 4
+        if reader.imageCount() * frame_size > self.memory_budget:
+            self._stream(frame_size)
+            return
         
-    def run(self):
-        while self.running:
-            current_time = datetime.datetime.now().strftime("%H:%M")
-            for reminder in self.reminders:
-                if reminder["time"] == current_time and reminder["active"]:
-                    self.reminder_signal.emit(reminder["text"])
-                    reminder["active"] = False
-            time.sleep(30)
-            
+        while True:
+            pixmap, delay = self._read(reader)
+            if pixmap is None:
+                break
+            self.frames.append((pixmap, delay))
+            self.frame_bytes += frame_size
+            if self.frame_bytes > self.memory_budget:
+                self.frames = []
+                self._stream(frame_size)
+                return
+        
+        if self.frames:
+            self.current, self.delay = self.frames[0]
+    
+    def _stream(self, frame_size):
+        self.reader = self._open_reader()
+        self.frame_bytes = frame_size
+        self.current, self.delay = self._read(self.reader)
+    
+    def is_valid(self):
+        return self.current is not None
+    
+    def is_running(self):
+        return self.timer.isActive()
+    
+    def current_pixmap(self):
+        return self.current
+    
+    def start(self):
+        if self.timer.isActive() or not self.is_valid() or self.finished:
+            return
+        if self.reader is None and len(self.frames) < 2:
+            return
+        self.timer.start(self.delay)
+    
     def stop(self):
-        self.running = False
+        self.timer.stop()
+    
+    def _advance(self):
+        start = time.thread_time()
+        if self.reader is not None:
+            pixmap, delay = self._read(self.reader)
+            if pixmap is None:
+                if not self._next_loop():
+                    return
+                self.reader = self._open_reader()
+                pixmap, delay = self._read(self.reader)
+            if pixmap is None:
+                return
+            self.current, self.delay = pixmap, delay
+        else:
+            if self.index + 1 == len(self.frames) and not self._next_loop():
+                return
+            self.index = (self.index + 1) % len(self.frames)
+            self.current, self.delay = self.frames[self.index]
+        self.timer.start(self.delay)
+        self.ticks += 1
+        self.tick_cpu += time.thread_time() - start
+        self.frame_changed.emit()
+    
+    def _next_loop(self):
+        if 0 <= self.loop_count <= self.loops_played:
+            self.finished = True
+            return False
+        self.loops_played += 1
+        return True
+    
+    def stats(self):
+        return {
+            "mode": "streaming" if self.reader is not None else "cached",
+            "frames": self.reader.imageCount() if self.reader is not None else len(self.frames),
+            "memory_bytes": self.frame_bytes,
+            "decode_cpu_ms": round(self.decode_cpu * 1000, 2),
+            "ticks": self.ticks,
+            "tick_cpu_ms": round(self.tick_cpu * 1000, 2),
+            "loop_count": self.loop_count,
+            "finished": self.finished,
+            "running": self.is_running()
+        }
 
 class CharacterWidget(QWidget):
     clicked_signal = pyqtSignal()
     
-    def __init__(self, image_path=None):
+    SPRITE_SIZE = 200
+    BUBBLE_AREA = 90
+    BUBBLE_PADDING = 10
+    BUBBLE_TAIL = 10
+    BUBBLE_MIN_WIDTH = 80
+    
+    def __init__(self, image_path=None, image_cache=None):
         super().__init__()
         self.setWindowTitle("Anime Character")
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         
-        self.setMinimumSize(200, 200)
+        self.setFixedSize(self.SPRITE_SIZE, self.BUBBLE_AREA + self.SPRITE_SIZE)
+        self.sprite_rect = QRect(0, self.BUBBLE_AREA, self.SPRITE_SIZE, self.SPRITE_SIZE)
         
         self.image_path = image_path
-        self.pixmap = None
-        self.movie = None
+        self.image_cache = image_cache or default_image_cache
+        self.sprite = None
+        self.animation = None
+        self.watched_window = None
         self.update_image(image_path)
         
         self.speech_text = ""
         self.show_speech = False
+        self.bubble_font = QFont('Arial', 10)
+        self.bubble_pixmap = None
+        self.bubble_rect = QRect()
         self.speech_timer = QTimer()
         self.speech_timer.timeout.connect(self.hide_speech)
         
         self.drag_position = None
         
+        QApplication.instance().applicationStateChanged.connect(self._update_animation)
+        
         self.reposition()
     
     def update_image(self, image_path):
         self.image_path = image_path
         
         if image_path and os.path.exists(image_path):
+            if self.animation:
+                self.animation.stop()
+                self.animation.deleteLater()
+                self.animation = None
             if image_path.lower().endswith('.gif'):
-                self.movie = QMovie(image_path)
-                self.movie.setScaledSize(QSize(200, 200))
-                self.movie.start()
-                self.pixmap = None
+                self.animation = FrameAnimation(image_path, QSize(self.SPRITE_SIZE, self.SPRITE_SIZE),
+                                                self.devicePixelRatioF(), parent=self)
+                self.animation.frame_changed.connect(self._animation_frame)
+                self.sprite = None
+                self._update_animation()
             else:
-                self.pixmap = QPixmap(image_path)
-                self.movie = None
-            self.setFixedSize(200, 200)
-            self.update()
+                sprite = self.image_cache.pixmap(image_path, self.SPRITE_SIZE, self.SPRITE_SIZE,
+                                                 self.devicePixelRatioF())
+                self.sprite = None if sprite.isNull() else sprite
+            self.update(self.sprite_rect)
+    
+    def _animation_should_run(self):
+        if not self.isVisible() or self.isMinimized():
+            return False
+        if QApplication.applicationState() in (Qt.ApplicationHidden, Qt.ApplicationSuspended):
+            return False
+        handle = self.windowHandle()
+        return handle is None or handle.isExposed()
+    
+    def _update_animation(self, *args):
+        if not self.animation:
+            return
+        if self._animation_should_run():
+            self.animation.start()
+        else:
+            self.animation.stop()
+    
+    def _animation_frame(self):
+        handle = self.windowHandle()
+        if handle is not None and not handle.isExposed():
+            self.animation.stop()
+            return
+        self.update(self.sprite_rect)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        handle = self.windowHandle()
+        if handle is not None and handle is not self.watched_window:
+            handle.installEventFilter(self)
+            self.watched_window = handle
+        self._update_animation()
+    
+    def eventFilter(self, watched, event):
+        if watched is self.watched_window and event.type() == QEvent.Expose:
+            self._update_animation()
+        return False
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_animation()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self._update_animation()
     
     def show_message(self, text):
+        dirty = QRect(self.bubble_rect) if self.show_speech else QRect()
         self.speech_text = text
         self.show_speech = True
-        self.update()
+        self.bubble_pixmap, self.bubble_rect = self._render_bubble(text)
+        self.update(dirty.united(self.bubble_rect))
         self.speech_timer.start(5000)
     
     def hide_speech(self):
         self.show_speech = False
-        self.update()
+        self.bubble_pixmap = None
+        self.update(self.bubble_rect)
         self.speech_timer.stop()
     
+    def stats(self):
+        bubble_bytes = 0
+        if self.bubble_pixmap is not None:
+            bubble_bytes = self.bubble_pixmap.width() * self.bubble_pixmap.height() * self.bubble_pixmap.depth() // 8
+        return {
+            "visible": self.isVisible(),
+            "sprite": self.sprite is not None,
+            "bubble_bytes": bubble_bytes,
+            "animation": self.animation.stats() if self.animation else None
+        }
+    
+    def _render_bubble(self, text):
+        metrics = QFontMetrics(self.bubble_font)
+        padding = self.BUBBLE_PADDING
+        max_text = QRect(0, 0, self.width() - 2 * padding,
+                         self.BUBBLE_AREA - self.BUBBLE_TAIL - 2 * padding)
+        flags = Qt.AlignCenter | Qt.TextWordWrap
+        
+        def fits(candidate):
+            return metrics.boundingRect(max_text, flags, candidate).height() <= max_text.height()
+        
+        if not fits(text):
+            low, high = 0, len(text)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if fits(text[:middle].rstrip() + "\u2026"):
+                    low = middle
+                else:
+                    high = middle - 1
+            text = text[:low].rstrip() + "\u2026"
+        
+        text_rect = metrics.boundingRect(max_text, flags, text)
+        width = max(self.BUBBLE_MIN_WIDTH, text_rect.width() + 2 * padding)
+        height = min(text_rect.height(), max_text.height()) + 2 * padding
+        rect = QRect((self.width() - width) // 2, self.BUBBLE_AREA - height - self.BUBBLE_TAIL,
+                     width, height + self.BUBBLE_TAIL)
+        
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(rect.width() * ratio), int(rect.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.black)
+        painter.setBrush(Qt.white)
+        painter.drawRoundedRect(0, 0, width - 1, height - 1, 10, 10)
+        
+        center = width // 2
+        painter.drawPolygon(QPoint(center, height + self.BUBBLE_TAIL - 1),
+                            QPoint(center - 10, height - 1),
+                            QPoint(center + 10, height - 1))
+        
+        painter.setFont(self.bubble_font)
+        painter.drawText(padding, padding, width - 2 * padding, height - 2 * padding, flags, text)
+        painter.end()
+        return pixmap, rect
+    
     def reposition(self):
         desktop = QDesktopWidget().availableGeometry()
         self.move(desktop.width() - self.width() - 20, 
@@ -192,39 +2927,16 @@ class CharacterWidget(QWidget):
     
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-        
-        if self.movie and self.movie.isValid():
-            current_frame = self.movie.currentPixmap()
-            painter.drawPixmap(0, 0, current_frame)
-        elif self.pixmap and not self.pixmap.isNull():
-            painter.drawPixmap(0, 0, self.pixmap.scaled(
-                200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        
-        if self.show_speech and self.speech_text:
-            bubble_width = max(200, len(self.speech_text) * 8)
-            bubble_height = 60
-            
-            bubble_x = (self.width() - bubble_width) // 2
-            bubble_y = -bubble_height
-            
-            painter.setPen(Qt.black)
-            painter.setBrush(Qt.white)
-            painter.drawRoundedRect(bubble_x, bubble_y, bubble_width, bubble_height, 10, 10)
-            
-            points = [
-                QPoint(self.width() // 2, 0),
-                QPoint(self.width() // 2 - 10, -10),
-                QPoint(self.width() // 2 + 10, -10)
-            ]
-            painter.drawPolygon(points)
-            
-            painter.setPen(Qt.black)
-            painter.setFont(QFont('Arial', 10))
-            painter.drawText(bubble_x + 10, bubble_y + 10, 
-                          bubble_width - 20, bubble_height - 20,
-                          Qt.AlignCenter | Qt.TextWordWrap, self.speech_text)
+        dirty = event.rect()
+        
+        if dirty.intersects(self.sprite_rect):
+            if self.animation and self.animation.is_valid():
+                painter.drawPixmap(self.sprite_rect.topLeft(), self.animation.current_pixmap())
+            elif self.sprite:
+                painter.drawPixmap(self.sprite_rect.topLeft(), self.sprite)
+        
+        if self.show_speech and self.bubble_pixmap and dirty.intersects(self.bubble_rect):
+            painter.drawPixmap(self.bubble_rect.topLeft(), self.bubble_pixmap)
     
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -238,38 +2950,303 @@ class CharacterWidget(QWidget):
             self.move(event.globalPos() - self.drag_position)
             event.accept()
 
-class AnimeReminderWidget(QWidget):
-    def __init__(self):
+class PerformanceStatsWindow(QWidget):
+    def __init__(self, tracer=None):
         super().__init__()
-        self.setWindowTitle("Anime Reminder Assistant")
-        self.setWindowFlags(Qt.Window)
-        
-        pygame.init()
+        self.tracer = tracer or default_tracer
+        self.setWindowTitle("Performance Stats")
+        self.resize(520, 360)
+        
+        layout = QVBoxLayout()
+        self.enabled_checkbox = QCheckBox("Record stage latencies")
+        self.enabled_checkbox.setChecked(self.tracer.enabled)
+        self.enabled_checkbox.toggled.connect(self.set_enabled)
+        
+        self.stats_view = QTextEdit()
+        self.stats_view.setReadOnly(True)
+        self.stats_view.setFont(QFont("Courier New", 10))
+        
+        buttons = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        json_btn = QPushButton("Export JSON")
+        json_btn.clicked.connect(lambda: self.export("JSON Files (*.json)", self.tracer.to_json))
+        prometheus_btn = QPushButton("Export Prometheus")
+        prometheus_btn.clicked.connect(lambda: self.export("Text Files (*.prom *.txt)",
+                                                           self.tracer.to_prometheus))
+        buttons.addWidget(reset_btn)
+        buttons.addWidget(json_btn)
+        buttons.addWidget(prometheus_btn)
+        
+        layout.addWidget(self.enabled_checkbox)
+        layout.addWidget(self.stats_view)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+    
+    def set_enabled(self, enabled):
+        self.tracer.enabled = enabled
+        self.refresh()
+    
+    def reset(self):
+        self.tracer.reset()
+        self.refresh()
+    
+    def refresh(self):
+        lines = [f"{'stage':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for stage, stats in self.tracer.snapshot().items():
+            lines.append(f"{stage:<16}{stats['count']:>7}" + "".join(
+                f"{stats[key] * 1000:>10.1f}" for key in ("p50", "p95", "p99", "max")))
+        if len(lines) == 1:
+            lines.append("No samples yet." if self.tracer.enabled else "Tracing is off.")
+        self.stats_view.setPlainText("\n".join(lines))
+    
+    def export(self, file_filter, render):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Performance Stats", "", file_filter)
+        if not path:
+            return
+        try:
+            with open(path, "w") as f:
+                f.write(render())
+        except OSError as e:
+            print(f"Error exporting stats: {e}")
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start(1000)
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+class ResourceWindow(QWidget):
+    def __init__(self, monitor=None):
+        super().__init__()
+        self.monitor = monitor or default_resources
+        self.setWindowTitle("Resource Usage")
+        self.resize(560, 480)
+        
+        layout = QVBoxLayout()
+        self.allocations_checkbox = QCheckBox("Track allocations (slows the app down)")
+        self.allocations_checkbox.setChecked(tracemalloc.is_tracing())
+        self.allocations_checkbox.toggled.connect(self.set_allocation_tracing)
+        
+        self.report_view = QTextEdit()
+        self.report_view.setReadOnly(True)
+        self.report_view.setFont(QFont("Courier New", 10))
+        
+        buttons = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        collect_btn = QPushButton("Collect Garbage")
+        collect_btn.clicked.connect(self.collect_garbage)
+        export_btn = QPushButton("Export JSON")
+        export_btn.clicked.connect(self.export)
+        buttons.addWidget(refresh_btn)
+        buttons.addWidget(collect_btn)
+        buttons.addWidget(export_btn)
+        
+        layout.addWidget(self.allocations_checkbox)
+        layout.addWidget(self.report_view)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+    
+    def set_allocation_tracing(self, enabled):
+        if enabled:
+            self.monitor.start_allocation_tracing()
+        else:
+            self.monitor.stop_allocation_tracing()
+        self.refresh()
+    
+    def collect_garbage(self):
+        gc.collect()
+        self.refresh()
+    
+    def refresh(self):
+        self.report_view.setPlainText(self.monitor.to_json())
+    
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Resource Usage", "", "JSON Files (*.json)")
+        if not path:
+            return
+        try:
+            with open(path, "w") as f:
+                f.write(self.monitor.to_json())
+        except OSError as e:
+            print(f"Error exporting resource usage: {e}")
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+DEFAULT_VOICE_SETTINGS = {
+    "language": "ja",
+    "speed": 1.2,
+    "pitch": 1.3,
+    "add_words": True,
+    "pipeline": "memory",
+    "dsp": "pydub",
+    "tts_backend": "gtts",
+    "streaming": False,
+    "offload": False
+}
+
+class ReminderCore(QObject):
+    reminder_fired = pyqtSignal(object)
         
+    def __init__(self, storage="json", parent=None):
+        super().__init__(parent)
         self.image_path = ""
         self.reminders = []
+        self.prerender_minutes = 10
         
-        self.voice_settings = {
-            "language": "ja",
-            "speed": 1.2,
-            "pitch": 1.3,
-            "add_words": True
-        }
+        self.voice_settings = dict(DEFAULT_VOICE_SETTINGS)
         
         self.settings_file = "anime_reminder_settings.json"
+        self.store = WriteBehindStore(
+            open_settings_store(storage, self.settings_file, "anime_reminder_settings.db"))
         self.load_settings()
         
-        self.character_widget = CharacterWidget(self.image_path)
+        self.reminder_thread = ReminderThread(self.reminders)
+        self.reminder_thread.reminder_signal.connect(self.fire_reminder)
+        self.reminder_thread.start()
+        
+        self.audio_cache = AudioCache("anime_reminder_cache")
+        self.prerender_thread = PreRenderThread(
+            self.reminder_thread.scheduler, self.voice_settings, self.audio_cache, self.prerender_minutes)
+        self.store.handed_off.connect(self.prerender_thread.refresh)
+        self.voice_service = VoiceService(self.audio_cache)
+        self.track_resources()
+    
+    def start_audio(self):
+        self.audio_thread = threading.Thread(target=warm_up_audio, name="audio-warmup", daemon=True)
+        self.audio_thread.start()
+        self.voice_service.start()
+        self.prerender_thread.start()
+        if self.voice_settings["offload"]:
+            default_offload.start()
+    
+    def track_resources(self):
+        default_resources.add_source("audio_cache", self.audio_cache)
+        default_resources.add_source("voice_service", self.voice_service)
+        default_resources.add_source("settings_store", self.store)
+        default_resources.track_thread("reminders", self.reminder_thread)
+        default_resources.track_thread("voice", self.voice_service)
+        default_resources.track_thread("prerender", self.prerender_thread)
+    
+    def fire_reminder(self, reminder):
+        default_tracer.finish(id(reminder), "dispatch")
+        finish_occurrence(reminder, time.time())
+        self.voice_service.submit(reminder["text"], self.voice_settings, "reminder")
+        self.save_settings([reminder])
+        self.reminder_fired.emit(reminder)
+    
+    def speak(self, text, kind="test"):
+        self.voice_service.submit(text, self.voice_settings, kind)
+    
+    def voice_settings_changed(self):
+        if self.voice_settings["offload"]:
+            default_offload.start()
+        self.save_settings([])
+    
+    def add_reminders(self, reminders, insert=None):
+        if not reminders:
+            return
+        (insert or self.reminders.extend)(reminders)
+        if len(reminders) == 1:
+            self.reminder_thread.add_reminder(reminders[0])
+        else:
+            self.reminder_thread.add_reminders(reminders)
+        self.save_settings(reminders)
+    
+    def update_reminder(self, reminder):
+        self.reminder_thread.update_reminder(reminder)
+        self.save_settings([reminder])
+    
+    def discard_reminders(self, reminders):
+        gone = {id(reminder) for reminder in reminders}
+        removed = [reminder for reminder in self.reminders if id(reminder) in gone]
+        self.reminders[:] = [reminder for reminder in self.reminders if id(reminder) not in gone]
+        return removed
+    
+    def remove_reminders(self, reminders, discard=None):
+        removed = (discard or self.discard_reminders)(reminders)
+        for reminder in removed:
+            self.reminder_thread.remove_reminder(reminder)
+        self.store.remove_reminders(removed)
+        self.save_settings([])
+        return removed
+    
+    def import_file(self, path, insert=None):
+        result = import_reminders_file(path, self.reminders)
+        self.add_reminders(result["imported"], insert)
+        return result
+    
+    def export_file(self, path):
+        export_reminders_file(path, self.reminders)
+        return len(self.reminders)
+    
+    def load_settings(self):
+        settings = self.store.load()
+        self.image_path = settings.get("image_path", "")
+        self.reminders = settings.get("reminders", [])
+        self.prerender_minutes = settings.get("prerender_minutes", self.prerender_minutes)
+        
+        if "voice_settings" in settings:
+            self.voice_settings.update(settings["voice_settings"])
+    
+    def save_settings(self, changed_reminders=None):
+        settings = {
+            "image_path": self.image_path,
+            "reminders": self.reminders,
+            "voice_settings": self.voice_settings,
+            "prerender_minutes": self.prerender_minutes
+        }
+        
+        self.store.save(settings, changed_reminders)
+    
+    def stop(self):
+        self.reminder_thread.stop()
+        self.reminder_thread.wait()
+        self.prerender_thread.stop()
+        self.prerender_thread.wait()
+        self.voice_service.stop()
+        if pygame.is_loaded() and pygame.mixer.get_init():
+            pygame.mixer.stop()
+        self.voice_service.wait(2000)
+        if hasattr(self, 'audio_thread'):
+            self.audio_thread.join(2)
+        
+        default_offload.shutdown()
+        
+        self.store.close()
+        
+        if pygame.is_loaded():
+            pygame.quit()
+
+class AnimeReminderWidget(QWidget):
+    def __init__(self, storage="json"):
+        super().__init__()
+        self.setWindowTitle("Anime Reminder Assistant")
+        self.setWindowFlags(Qt.Window)
+        
+        self.core = ReminderCore(storage, self)
+        self.core.reminder_fired.connect(self.show_reminder)
+        
+        self.image_cache = default_image_cache
+        self.character_widget = CharacterWidget(self.core.image_path, self.image_cache)
         self.character_widget.clicked_signal.connect(self.show)
         self.character_widget.show()
         
         self.init_ui()
+        self.setup_tray()
         
-        self.reminder_thread = ReminderThread(self.reminders)
-        self.reminder_thread.reminder_signal.connect(self.show_reminder)
-        self.reminder_thread.start()
+        default_resources.add_source("character", self.character_widget)
         
-        self.setup_tray()
+        QTimer.singleShot(0, self.core.start_audio)
         
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -279,9 +3256,9 @@ class AnimeReminderWidget(QWidget):
         self.character_label.setMinimumSize(200, 200)
         self.character_label.setStyleSheet("background-color: #f0f0f0; border-radius: 10px;")
         
-        if self.image_path and os.path.exists(self.image_path):
-            pixmap = QPixmap(self.image_path)
-            self.character_label.setPixmap(pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        if self.core.image_path and os.path.exists(self.core.image_path):
+            self.character_label.setPixmap(
+                self.image_cache.pixmap(self.core.image_path, 200, 200, self.devicePixelRatioF()))
         
         self.select_image_btn = QPushButton("Select Character Image")
         self.select_image_btn.clicked.connect(self.select_image)
@@ -294,11 +3271,11 @@ class AnimeReminderWidget(QWidget):
         self.lang_combo = QComboBox()
         self.lang_combo.addItems(["Japanese", "English", "Korean", "Chinese"])
         index = 0
-        if self.voice_settings["language"] == "en":
+        if self.core.voice_settings["language"] == "en":
             index = 1
-        elif self.voice_settings["language"] == "ko":
+        elif self.core.voice_settings["language"] == "ko":
             index = 2
-        elif self.voice_settings["language"] == "zh-CN":
+        elif self.core.voice_settings["language"] == "zh-CN":
             index = 3
         self.lang_combo.setCurrentIndex(index)
         self.lang_combo.currentIndexChanged.connect(self.update_voice_settings)
@@ -310,7 +3287,7 @@ class AnimeReminderWidget(QWidget):
         self.speed_slider = QSlider(Qt.Horizontal)
         self.speed_slider.setMinimum(80)
         self.speed_slider.setMaximum(150)
-        self.speed_slider.setValue(int(self.voice_settings["speed"] * 100))
+        self.speed_slider.setValue(int(self.core.voice_settings["speed"] * 100))
         self.speed_slider.valueChanged.connect(self.update_voice_settings)
         speed_layout.addWidget(speed_label)
         speed_layout.addWidget(self.speed_slider)
@@ -320,7 +3297,7 @@ class AnimeReminderWidget(QWidget):
         self.pitch_slider = QSlider(Qt.Horizontal)
         self.pitch_slider.setMinimum(80)
         self.pitch_slider.setMaximum(150)
-        self.pitch_slider.setValue(int(self.voice_settings["pitch"] * 100))
+        self.pitch_slider.setValue(int(self.core.voice_settings["pitch"] * 100))
         self.pitch_slider.valueChanged.connect(self.update_voice_settings)
         pitch_layout.addWidget(pitch_label)
         pitch_layout.addWidget(self.pitch_slider)
@@ -329,7 +3306,7 @@ class AnimeReminderWidget(QWidget):
         add_words_label = QLabel("Add Anime Words:")
         self.add_words_checkbox = QComboBox()
         self.add_words_checkbox.addItems(["Yes", "No"])
-        self.add_words_checkbox.setCurrentIndex(0 if self.voice_settings["add_words"] else 1)
+        self.add_words_checkbox.setCurrentIndex(0 if self.core.voice_settings["add_words"] else 1)
         self.add_words_checkbox.currentIndexChanged.connect(self.update_voice_settings)
         add_words_layout.addWidget(add_words_label)
         add_words_layout.addWidget(self.add_words_checkbox)
@@ -337,7 +3314,17 @@ class AnimeReminderWidget(QWidget):
         voice_layout.addLayout(lang_layout)
         voice_layout.addLayout(speed_layout)
         voice_layout.addLayout(pitch_layout)
+        offload_layout = QHBoxLayout()
+        offload_label = QLabel("Audio Processing:")
+        self.offload_combo = QComboBox()
+        self.offload_combo.addItems(["In app", "Separate process"])
+        self.offload_combo.setCurrentIndex(1 if self.core.voice_settings["offload"] else 0)
+        self.offload_combo.currentIndexChanged.connect(self.update_voice_settings)
+        offload_layout.addWidget(offload_label)
+        offload_layout.addWidget(self.offload_combo)
+        
         voice_layout.addLayout(add_words_layout)
+        voice_layout.addLayout(offload_layout)
         voice_group.setLayout(voice_layout)
         
         self.text_label = QLabel("Reminder Message:")
@@ -352,6 +3339,17 @@ class AnimeReminderWidget(QWidget):
         time_layout.addWidget(self.time_label)
         time_layout.addWidget(self.time_edit)
         
+        repeat_layout = QHBoxLayout()
+        repeat_label = QLabel("Repeat:")
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.setEditable(True)
+        self.repeat_combo.addItems(["Once", "Daily", "Weekdays", "Weekends", "Hourly",
+                                    "Every 5 minutes", "Every 30 minutes"])
+        self.repeat_combo.lineEdit().setPlaceholderText("or an RRULE, e.g. FREQ=WEEKLY;BYDAY=MO,WE")
+        self.repeat_combo.setToolTip("Pick a preset or type a rule such as FREQ=WEEKLY;BYDAY=MO,WE")
+        repeat_layout.addWidget(repeat_label)
+        repeat_layout.addWidget(self.repeat_combo)
+        
         self.add_reminder_btn = QPushButton("Add Reminder")
         self.add_reminder_btn.clicked.connect(self.add_reminder)
         
@@ -359,9 +3357,48 @@ class AnimeReminderWidget(QWidget):
         self.test_voice_btn.clicked.connect(self.test_voice)
         
         self.reminders_label = QLabel("Your Reminders:")
-        self.reminders_display = QTextEdit()
-        self.reminders_display.setReadOnly(True)
-        self.update_reminders_display()
+        self.reminders_model = ReminderTableModel(self.core.reminders, self)
+        self.reminders_model.reminder_edited.connect(self.reminder_edited)
+        self.reminders_proxy = ReminderFilterProxy(self)
+        self.reminders_proxy.setSourceModel(self.reminders_model)
+        
+        filter_layout = QHBoxLayout()
+        self.reminder_filter_edit = QLineEdit()
+        self.reminder_filter_edit.setPlaceholderText("Filter by time or text")
+        self.reminder_filter_edit.textChanged.connect(self.reminders_proxy.set_text_filter)
+        self.reminder_status_combo = QComboBox()
+        self.reminder_status_combo.addItems(ReminderFilterProxy.STATUSES)
+        self.reminder_status_combo.currentTextChanged.connect(self.reminders_proxy.set_status_filter)
+        filter_layout.addWidget(self.reminder_filter_edit)
+        filter_layout.addWidget(self.reminder_status_combo)
+        
+        self.reminders_display = QTableView()
+        self.reminders_display.setModel(self.reminders_proxy)
+        self.reminders_display.setSortingEnabled(True)
+        self.reminders_display.sortByColumn(ReminderTableModel.TIME, Qt.AscendingOrder)
+        self.reminders_display.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.reminders_display.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self.reminders_display.setWordWrap(False)
+        self.reminders_display.verticalHeader().hide()
+        self.reminders_display.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.reminders_display.verticalHeader().setDefaultSectionSize(22)
+        header = self.reminders_display.horizontalHeader()
+        header.setSectionResizeMode(ReminderTableModel.TIME, QHeaderView.Fixed)
+        header.setSectionResizeMode(ReminderTableModel.TEXT, QHeaderView.Stretch)
+        header.setSectionResizeMode(ReminderTableModel.STATUS, QHeaderView.Fixed)
+        header.resizeSection(ReminderTableModel.TIME, 55)
+        header.resizeSection(ReminderTableModel.STATUS, 100)
+        
+        self.delete_reminder_btn = QPushButton("Delete Selected")
+        self.delete_reminder_btn.clicked.connect(self.delete_selected_reminders)
+        
+        transfer_layout = QHBoxLayout()
+        self.import_btn = QPushButton("Import...")
+        self.import_btn.clicked.connect(self.import_reminders)
+        self.export_btn = QPushButton("Export...")
+        self.export_btn.clicked.connect(self.export_reminders)
+        transfer_layout.addWidget(self.import_btn)
+        transfer_layout.addWidget(self.export_btn)
         
         self.exit_btn = QPushButton("Hide to Tray")
         self.exit_btn.clicked.connect(self.hide)
@@ -372,10 +3409,14 @@ class AnimeReminderWidget(QWidget):
         main_layout.addWidget(self.text_label)
         main_layout.addWidget(self.text_edit)
         main_layout.addLayout(time_layout)
+        main_layout.addLayout(repeat_layout)
         main_layout.addWidget(self.add_reminder_btn)
         main_layout.addWidget(self.test_voice_btn)
         main_layout.addWidget(self.reminders_label)
+        main_layout.addLayout(filter_layout)
         main_layout.addWidget(self.reminders_display)
+        main_layout.addWidget(self.delete_reminder_btn)
+        main_layout.addLayout(transfer_layout)
         main_layout.addWidget(self.exit_btn)
         
         self.setLayout(main_layout)
@@ -401,11 +3442,11 @@ class AnimeReminderWidget(QWidget):
             QPushButton:hover {
                 background-color: #c180ff;
             }
-            QTextEdit {
+            QTextEdit, QTableView {
                 border: 1px solid #d9b3ff;
                 border-radius: 5px;
             }
-            QTimeEdit, QComboBox {
+            QTimeEdit, QComboBox, QLineEdit {
                 border: 1px solid #d9b3ff;
                 border-radius: 5px;
                 padding: 5px;
@@ -442,19 +3483,21 @@ class AnimeReminderWidget(QWidget):
     
     def update_voice_settings(self):
         lang_map = ["ja", "en", "ko", "zh-CN"]
-        self.voice_settings["language"] = lang_map[self.lang_combo.currentIndex()]
+        self.core.voice_settings["language"] = lang_map[self.lang_combo.currentIndex()]
         
-        self.voice_settings["speed"] = self.speed_slider.value() / 100.0
-        self.voice_settings["pitch"] = self.pitch_slider.value() / 100.0
+        self.core.voice_settings["speed"] = self.speed_slider.value() / 100.0
+        self.core.voice_settings["pitch"] = self.pitch_slider.value() / 100.0
         
-        self.voice_settings["add_words"] = (self.add_words_checkbox.currentIndex() == 0)
+        self.core.voice_settings["add_words"] = (self.add_words_checkbox.currentIndex() == 0)
         
-        self.save_settings()
+        self.core.voice_settings["offload"] = (self.offload_combo.currentIndex() == 1)
+        
+        self.core.voice_settings_changed()
     
     def setup_tray(self):
         self.tray_icon = QSystemTrayIcon(self)
-        if self.image_path and os.path.exists(self.image_path):
-            self.tray_icon.setIcon(QIcon(self.image_path))
+        if self.core.image_path and os.path.exists(self.core.image_path):
+            self.tray_icon.setIcon(self.image_cache.icon(self.core.image_path))
         else:
             self.tray_icon.setIcon(QIcon.fromTheme("appointment-soon"))
         
@@ -463,15 +3506,21 @@ class AnimeReminderWidget(QWidget):
         quit_action = QAction("Exit", self)
         show_character_action = QAction("Show Character", self)
         hide_character_action = QAction("Hide Character", self)
+        stats_action = QAction("Performance stats", self)
+        resources_action = QAction("Resource usage", self)
         
         show_action.triggered.connect(self.show)
         quit_action.triggered.connect(self.quit_app)
         show_character_action.triggered.connect(self.show_character)
         hide_character_action.triggered.connect(self.hide_character)
+        stats_action.triggered.connect(self.show_performance_stats)
+        resources_action.triggered.connect(self.show_resources)
         
         tray_menu.addAction(show_action)
         tray_menu.addAction(show_character_action)
         tray_menu.addAction(hide_character_action)
+        tray_menu.addAction(stats_action)
+        tray_menu.addAction(resources_action)
         tray_menu.addSeparator()
         tray_menu.addAction(quit_action)
         
@@ -489,6 +3538,18 @@ class AnimeReminderWidget(QWidget):
     def hide_character(self):
         self.character_widget.hide()
     
+    def show_performance_stats(self):
+        if not hasattr(self, 'stats_window'):
+            self.stats_window = PerformanceStatsWindow()
+        self.stats_window.show()
+        self.stats_window.raise_()
+    
+    def show_resources(self):
+        if not hasattr(self, 'resource_window'):
+            self.resource_window = ResourceWindow()
+        self.resource_window.show()
+        self.resource_window.raise_()
+    
     def select_image(self):
         file_dialog = QFileDialog()
         image_path, _ = file_dialog.getOpenFileName(
@@ -496,15 +3557,15 @@ class AnimeReminderWidget(QWidget):
         )
         
         if image_path:
-            self.image_path = image_path
-            pixmap = QPixmap(image_path)
-            self.character_label.setPixmap(pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            self.core.image_path = image_path
+            self.character_label.setPixmap(
+                self.image_cache.pixmap(image_path, 200, 200, self.devicePixelRatioF()))
             
             self.character_widget.update_image(image_path)
             
-            self.tray_icon.setIcon(QIcon(image_path))
+            self.tray_icon.setIcon(self.image_cache.icon(image_path))
             
-            self.save_settings()
+            self.core.save_settings([])
     
     def add_reminder(self):
         reminder_text = self.text_edit.toPlainText().strip()
@@ -513,86 +3574,86 @@ class AnimeReminderWidget(QWidget):
         
         reminder_time = self.time_edit.time().toString("HH:mm")
         
-        reminder = {
-            "text": reminder_text,
-            "time": reminder_time,
-            "active": True
-        }
+        try:
+            reminder = make_reminder(reminder_text, reminder_time, self.repeat_combo.currentText())
+        except ValueError as e:
+            QMessageBox.warning(self, "Repeat", str(e))
+            return
         
-        self.reminders.append(reminder)
-        self.update_reminders_display()
-        self.save_settings()
+        self.core.add_reminders([reminder], self.reminders_model.append_reminders)
         
         self.text_edit.clear()
     
-    def update_reminders_display(self):
-        self.reminders_display.clear()
-        for i, reminder in enumerate(self.reminders):
-            status = "Active" if reminder["active"] else "Done"
-            self.reminders_display.append(f"{i+1}. {reminder['time']} - {reminder['text']} ({status})")
+    def reminder_edited(self, reminder):
+        self.core.update_reminder(reminder)
+    
+    def delete_selected_reminders(self):
+        rows = self.reminders_display.selectionModel().selectedRows()
+        if not rows:
+            return
+        selected = [self.reminders_proxy.reminder_at(index.row()) for index in rows]
+        self.core.remove_reminders(selected, self.reminders_model.remove_reminders)
+    
+    def import_reminders(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Reminders", "", "Reminder Files (*.csv *.ics);;All Files (*)")
+        if not path:
+            return
+        
+        result = self.import_reminders_file(path)
+        if result is None:
+            return
+        message = (f"Imported {len(result['imported'])} reminders, skipped {result['duplicates']} "
+                   f"duplicates and {result['invalid']} invalid entries.")
+        if result["errors"]:
+            message += "\n\n" + "\n".join(result["errors"])
+        QMessageBox.information(self, "Import Reminders", message)
+    
+    def import_reminders_file(self, path):
+        try:
+            return self.core.import_file(path, self.reminders_model.append_reminders)
+        except (OSError, ValueError, csv.Error) as e:
+            QMessageBox.warning(self, "Import Reminders", f"Could not import {path}: {e}")
+            return None
+    
+    def export_reminders(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Reminders", "reminders.csv", "CSV Files (*.csv);;iCalendar Files (*.ics)")
+        if not path:
+            return
+        try:
+            self.core.export_file(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Reminders", f"Could not export {path}: {e}")
     
     def test_voice(self):
         text = self.text_edit.toPlainText().strip()
         if not text:
             text = "Hello! I'm your anime reminder assistant, desu!"
         
-        if hasattr(self, 'voice_player') and self.voice_player.isRunning():
-            return
-            
-        self.voice_player = AnimeVoicePlayer(text, self.voice_settings)
-        self.voice_player.start()
+        self.core.speak(text)
         
         self.character_widget.show_message(text)
     
-    def show_reminder(self, text):
+    def show_reminder(self, reminder):
+        text = reminder["text"]
+        
         self.tray_icon.showMessage("Anime Reminder", text, QSystemTrayIcon.Information, 5000)
         
         self.character_widget.show()
         
         self.character_widget.show_message(text)
         
-        if hasattr(self, 'voice_player') and self.voice_player.isRunning():
-            return
-            
-        self.voice_player = AnimeVoicePlayer(text, self.voice_settings)
-        self.voice_player.start()
-        
-        self.update_reminders_display()
-        self.save_settings()
-    
-    def load_settings(self):
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    self.image_path = settings.get("image_path", "")
-                    self.reminders = settings.get("reminders", [])
-                    
-                    if "voice_settings" in settings:
-                        self.voice_settings.update(settings["voice_settings"])
-            except:
-                pass
-    
-    def save_settings(self):
-        settings = {
-            "image_path": self.image_path,
-            "reminders": self.reminders,
-            "voice_settings": self.voice_settings
-        }
-        
-        with open(self.settings_file, 'w') as f:
-            json.dump(settings, f)
+        self.reminders_model.reminder_changed(reminder)
     
     def quit_app(self):
-        if hasattr(self, 'reminder_thread'):
-            self.reminder_thread.stop()
-            self.reminder_thread.wait()
-        
         self.character_widget.hide()
+        if hasattr(self, 'stats_window'):
+            self.stats_window.close()
+        if hasattr(self, 'resource_window'):
+            self.resource_window.close()
         
-        self.save_settings()
-        
-        pygame.quit()
+        self.core.stop()
         
         QApplication.quit()
     
@@ -600,7 +3661,191 @@ class AnimeReminderWidget(QWidget):
         event.ignore()
         self.hide()
 
+class ReminderDaemon(QObject):
+    def __init__(self, storage="json", socket_name="anime-reminder"):
+        super().__init__()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.accept_connection)
+        if daemon_running(socket_name):
+            raise ConnectionError(f"Another daemon is already listening on {socket_name}")
+        QLocalServer.removeServer(socket_name)
+        if not self.server.listen(socket_name):
+            print(f"Error listening on {socket_name}: {self.server.errorString()}")
+        self.buffers = {}
+        
+        self.core = ReminderCore(storage, self)
+        self.core.reminder_fired.connect(self.show_reminder)
+        
+        QTimer.singleShot(0, self.core.start_audio)
+    
+    def show_reminder(self, reminder):
+        print(f"Reminder {reminder['time']}: {reminder['text']}")
+    
+    def accept_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self.buffers[connection] = b""
+            connection.readyRead.connect(lambda connection=connection: self.read_command(connection))
+            connection.disconnected.connect(lambda connection=connection: self.drop_connection(connection))
+    
+    def drop_connection(self, connection):
+        self.buffers.pop(connection, None)
+        connection.deleteLater()
+    
+    def read_command(self, connection):
+        self.buffers[connection] += bytes(connection.readAll())
+        while b"\n" in self.buffers[connection]:
+            line, self.buffers[connection] = self.buffers[connection].split(b"\n", 1)
+            try:
+                response = self.handle_command(json.loads(line.decode("utf-8")))
+            except (ValueError, KeyError, TypeError, OSError, csv.Error) as e:
+                response = {"ok": False, "error": str(e)}
+            connection.write(json.dumps(response).encode("utf-8") + b"\n")
+            connection.flush()
+    
+    def handle_command(self, command):
+        action = command["command"]
+        if action == "list":
+            return {"ok": True, "reminders": [dict(reminder, index=i + 1)
+                                              for i, reminder in enumerate(self.core.reminders)]}
+        
+        if action == "add":
+            text = str(command["text"]).strip()
+            time_of_day = QTime.fromString(str(command["time"]), "HH:mm")
+            if not text or not time_of_day.isValid():
+                return {"ok": False, "error": "add needs a text and a HH:MM time"}
+            reminder = make_reminder(text, time_of_day.toString("HH:mm"), command.get("repeat"))
+            self.core.add_reminders([reminder])
+            return {"ok": True, "reminder": dict(reminder, index=len(self.core.reminders))}
+        
+        if action == "remove":
+            index = int(command["index"])
+            if not 1 <= index <= len(self.core.reminders):
+                return {"ok": False, "error": f"no reminder {index}"}
+            reminder = self.core.reminders[index - 1]
+            self.core.remove_reminders([reminder])
+            return {"ok": True, "reminder": reminder}
+        
+        if action == "stats":
+            if command.get("format") == "prometheus":
+                return {"ok": True, "prometheus": default_tracer.to_prometheus()}
+            return {"ok": True, "stats": json.loads(default_tracer.to_json())}
+        
+        if action == "import":
+            result = self.core.import_file(self.owned_path(str(command["path"]), True))
+            imported = result.pop("imported")
+            return {"ok": True, "imported": len(imported), **result}
+        
+        if action == "export":
+            return {"ok": True, "exported": self.core.export_file(self.owned_path(str(command["path"]), False))}
+        
+        if action == "resources":
+            if command.get("allocations"):
+                default_resources.start_allocation_tracing()
+            return {"ok": True, "resources": default_resources.snapshot(int(command.get("top", 10)))}
+        
+        return {"ok": False, "error": f"unknown command {action}"}
+    
+    def owned_path(self, path, must_exist):
+        if not os.path.isabs(path):
+            raise ValueError(f"{path} is not an absolute path")
+        path = os.path.realpath(path)
+        target = path if must_exist or os.path.exists(path) else os.path.dirname(path)
+        if os.stat(target).st_uid != os.getuid():
+            raise ValueError(f"{target} is not owned by the daemon's user")
+        return path
+    
+    def stop(self):
+        self.server.close()
+        self.core.stop()
+
+def quit_on_signals(app):
+    reader, writer = socket.socketpair()
+    writer.setblocking(False)
+    signal.set_wakeup_fd(writer.fileno())
+    notifier = QSocketNotifier(reader.fileno(), QSocketNotifier.Read)
+    notifier.activated.connect(lambda: reader.recv(64))
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: app.quit())
+    return reader, writer, notifier
+
+def daemon_running(socket_name, timeout_ms=500):
+    connection = QLocalSocket()
+    connection.connectToServer(socket_name)
+    running = connection.waitForConnected(timeout_ms)
+    connection.abort()
+    return running
+
+def send_control(socket_name, command, timeout_ms=3000):
+    connection = QLocalSocket()
+    connection.connectToServer(socket_name)
+    if not connection.waitForConnected(timeout_ms):
+        raise ConnectionError(f"Cannot reach {socket_name}: {connection.errorString()}")
+    
+    connection.write(json.dumps(command).encode("utf-8") + b"\n")
+    connection.waitForBytesWritten(timeout_ms)
+    data = b""
+    while b"\n" not in data:
+        if not connection.waitForReadyRead(timeout_ms):
+            raise TimeoutError(f"No reply from {socket_name}")
+        data += bytes(connection.readAll())
+    connection.disconnectFromServer()
+    return json.loads(data.split(b"\n", 1)[0].decode("utf-8"))
+
+def control_command(arguments, repeat=None):
+    action = arguments[0]
+    if action == "add" and len(arguments) >= 3:
+        return {"command": "add", "time": arguments[1], "text": " ".join(arguments[2:]), "repeat": repeat}
+    if action == "remove" and len(arguments) == 2:
+        return {"command": "remove", "index": arguments[1]}
+    if action == "list" and len(arguments) == 1:
+        return {"command": "list"}
+    if action == "stats" and len(arguments) <= 2:
+        return {"command": "stats", "format": arguments[1] if len(arguments) == 2 else "json"}
+    if action == "resources" and arguments[1:] in ([], ["allocations"]):
+        return {"command": "resources", "allocations": arguments[1:] == ["allocations"]}
+    if action in ("import", "export") and len(arguments) == 2:
+        return {"command": action, "path": os.path.abspath(arguments[1])}
+    raise ValueError("usage: --ctl list | --ctl add HH:MM TEXT | --ctl remove INDEX | --ctl stats [prometheus]"
+                     " | --ctl resources [allocations] | --ctl import FILE | --ctl export FILE")
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    widget = AnimeReminderWidget()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--socket", default="anime-reminder")
+    parser.add_argument("--ctl", nargs="+", metavar="ARG")
+    parser.add_argument("--repeat", help="recurrence for --ctl add, e.g. daily or FREQ=WEEKLY;BYDAY=MO")
+    parser.add_argument("--trace", action="store_true", help="record per-stage latency histograms")
+    args, qt_args = parser.parse_known_args()
+    default_tracer.enabled = args.trace
+    
+    if args.ctl:
+        app = QCoreApplication(sys.argv[:1])
+        try:
+            response = send_control(args.socket, control_command(args.ctl, args.repeat))
+        except (ValueError, ConnectionError, TimeoutError) as e:
+            print(e)
+            sys.exit(2)
+        if "prometheus" in response:
+            print(response["prometheus"], end="")
+        else:
+            print(json.dumps(response, indent=2))
+        sys.exit(0 if response.get("ok") else 1)
+    
+    if args.headless:
+        app = QCoreApplication(sys.argv[:1] + qt_args)
+        try:
+            daemon = ReminderDaemon(args.storage, args.socket)
+        except ConnectionError as e:
+            print(e)
+            sys.exit(1)
+        signal_wakeup = quit_on_signals(app)
+        status = app.exec_()
+        daemon.stop()
+        sys.exit(status)
+    
+    app = QApplication(sys.argv[:1] + qt_args)
+    widget = AnimeReminderWidget(args.storage)
     sys.exit(app.exec_())
\ No newline at end of file